@@ -0,0 +1,64 @@
+import threading
+
+'''
+Registry of compiled ansatz circuits.
+
+The ansatz structure (n_qubits, n_layers, CNOT ring) never changes between
+calls, only the input and weight values do. Every backend therefore builds
+its circuit once per structure and later calls only bind values:
+    "simulator" - StatevectorSimulator, with the CNOT ring fused into one
+                  precomputed permutation of the statevector indices
+    "qiskit"    - a ParameterVector template (QuantumLayers.compile_qiskit_ansatz)
+    "qnode"     - the PennyLane device + QNode (QuantumLayers.make_qnode)
+
+    from CircuitRegistry import registry
+    sim = registry.simulator(5, 4)
+    registry.stats()   # {"simulator": {"hits": 12, "misses": 1, "entries": 1}, ...}
+
+Entries are built under a lock, so threads asking for the same structure
+share one build.
+'''
+
+
+class CircuitRegistry:
+    def __init__(self):
+        self._entries = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, kind, key, build):
+        '''Return the entry for (kind, key), calling build() on the first request.'''
+        with self._lock:
+            counter = self._counters.setdefault(kind, {"hits": 0, "misses": 0})
+            entry = self._entries.get((kind, key))
+            if entry is not None:
+                counter["hits"] += 1
+                return entry
+            counter["misses"] += 1
+            entry = self._entries[(kind, key)] = build()
+            return entry
+
+    def simulator(self, n_qubits: int, n_layers: int):
+        from VQASimulator import StatevectorSimulator
+
+        return self.get("simulator", (n_qubits, n_layers), lambda: StatevectorSimulator(n_qubits, n_layers))
+
+    def entries(self, kind):
+        with self._lock:
+            return [entry for (k, _), entry in self._entries.items() if k == kind]
+
+    def stats(self):
+        with self._lock:
+            return {
+                kind: dict(counter, entries=sum(1 for k, _ in self._entries if k == kind))
+                for kind, counter in self._counters.items()
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._counters.clear()
+
+
+# Shared by every layer in the process
+registry = CircuitRegistry()
@@ -1,5 +1,9 @@
 import pandas as pd
+import numpy as np
 import csv
+import copy
+
+from Profiler import profiled
 
 '''
 This file is meant to load and format the specific data in the Datasets folder
@@ -25,18 +29,43 @@ adult_columns = [
     "hours-per-week", "native-country", "income"
 ]
 
-
+# Category levels of the adult dataset, in the order of adult.names.
+# A code is the position in its list, so codes are the same for every chunk,
+# every file and every run; values not listed here are appended when first seen.
+adult_categories = {
+    "workclass": ["Private", "Self-emp-not-inc", "Self-emp-inc", "Federal-gov", "Local-gov", "State-gov",
+                  "Without-pay", "Never-worked"],
+    "education": ["Bachelors", "Some-college", "11th", "HS-grad", "Prof-school", "Assoc-acdm", "Assoc-voc", "9th",
+                  "7th-8th", "12th", "Masters", "1st-4th", "10th", "Doctorate", "5th-6th", "Preschool"],
+    "marital-status": ["Married-civ-spouse", "Divorced", "Never-married", "Separated", "Widowed",
+                       "Married-spouse-absent", "Married-AF-spouse"],
+    "occupation": ["Tech-support", "Craft-repair", "Other-service", "Sales", "Exec-managerial", "Prof-specialty",
+                   "Handlers-cleaners", "Machine-op-inspct", "Adm-clerical", "Farming-fishing", "Transport-moving",
+                   "Priv-house-serv", "Protective-serv", "Armed-Forces"],
+    "relationship": ["Wife", "Own-child", "Husband", "Not-in-family", "Other-relative", "Unmarried"],
+    "race": ["White", "Asian-Pac-Islander", "Amer-Indian-Eskimo", "Other", "Black"],
+    "sex": ["Female", "Male"],
+    "native-country": ["United-States", "Cambodia", "England", "Puerto-Rico", "Canada", "Germany",
+                       "Outlying-US(Guam-USVI-etc)", "India", "Japan", "Greece", "South", "China", "Cuba", "Iran",
+                       "Honduras", "Philippines", "Italy", "Poland", "Jamaica", "Vietnam", "Mexico", "Portugal",
+                       "Ireland", "France", "Dominican-Republic", "Laos", "Ecuador", "Taiwan", "Haiti", "Columbia",
+                       "Hungary", "Guatemala", "Nicaragua", "Scotland", "Thailand", "Yugoslavia", "El-Salvador",
+                       "Trinadad&Tobago", "Peru", "Hong", "Holand-Netherlands"],
+    "income": ["<=50K", ">50K"],
+}
+
+# Numeric columns of the adult dataset and their compact dtypes
+adult_numeric = {
+    "age": np.int16, "fnlwgt": np.int32, "education-num": np.int16, "capital-gain": np.int32,
+    "capital-loss": np.int32, "hours-per-week": np.int16,
+}
+
+
+@profiled("data_reader")
 def data_reader(filepath):
 
     #print(f"Loading data from {filepath}...")
 
-    # Detect delimiter
-    with open(filepath, 'r', encoding='utf-8') as f:
-        sample = f.read(2048)
-        sniffer = csv.Sniffer()
-        dialect = sniffer.sniff(sample)
-        delimiter = dialect.delimiter
-    
     # Use custom columns if file is wdbc.data
     if filepath == "Datasets/breast+cancer+wisconsin+diagnostic/wdbc.data":
         df = pd.read_csv(filepath, delimiter=",", header=None, names=wdbc_columns)
@@ -46,6 +75,12 @@ def data_reader(filepath):
         df_train = pd.read_csv(filepath, names=adult_columns, skipinitialspace=True)
         df = pd.concat([df_train, df_test], ignore_index=True)
     else:
+        # Detect delimiter
+        with open(filepath, 'r', encoding='utf-8') as f:
+            sample = f.read(2048)
+            sniffer = csv.Sniffer()
+            dialect = sniffer.sniff(sample)
+            delimiter = dialect.delimiter
         df = pd.read_csv(filepath, delimiter=delimiter)
         # Insert index column if not present
         if not df.columns[0].lower().__str__().startswith('index'):
@@ -53,22 +88,124 @@ def data_reader(filepath):
 
     return df
 
-def data_cleaning(df, data=None):
-
-    # Remove duplicates
-    df = df.drop_duplicates()
-
-    # Remove rows with missing values
-    df = df.dropna()
-
-    # Remove rows with all zero values
-    df = df.loc[(df != 0).any(axis=1)]
-
-    # Remove rows with all NaN values
-    df = df.dropna(how='all')
-
-    if data is not None:
-        
-        df.drop(columns=["SMILES"])
-
+def _encode(values, levels):
+    # Integer codes against a growing level list; missing values get -1
+    codes = pd.Categorical(values, categories=levels).codes
+    unseen = (codes == -1) & values.notna().to_numpy()
+    if unseen.any():
+        levels.extend(pd.unique(values[unseen]))
+        codes = pd.Categorical(values, categories=levels).codes
+    return codes.astype(np.int16)
+
+def iter_data(filepath, chunksize=100_000, categories=None, dropna=True):
+    '''
+    Stream the adult dataset in typed, cleaned chunks instead of loading it whole.
+
+    filepath is one adult-style file or a list of them; "Datasets/adult/adult.data"
+    also streams adult.test after it, like data_reader, without building the
+    concatenated frame. Each yielded DataFrame has:
+        numeric columns     - compact integer dtypes (adult_numeric)
+        categorical columns - int16 codes into categories[col]
+        income              - trailing "." of adult.test removed before encoding
+    "?" is treated as missing; rows with a missing value are dropped unless
+    dropna=False, in which case they keep code -1 (or NaN for numbers).
+
+    categories defaults to a copy of adult_categories and is extended in place
+    with any new level, so pass the same dict to keep codes stable across calls.
+    The index is the row number over all files, so concatenated chunks have a
+    unique index. Only one chunk is held in memory at a time.
+    '''
+    if categories is None:
+        categories = copy.deepcopy(adult_categories)
+    if isinstance(filepath, str):
+        filepaths = [filepath]
+        if filepath == "Datasets/adult/adult.data":
+            filepaths.append("Datasets/adult/adult.test")
+    else:
+        filepaths = list(filepath)
+
+    # Row numbers continue across files, as in data_reader's concatenated frame
+    offset = 0
+    for path in filepaths:
+        rows = 0
+        reader = pd.read_csv(
+            path, names=adult_columns, skipinitialspace=True, na_values="?", comment="|",
+            dtype={col: "string" for col in categories}, chunksize=chunksize,
+        )
+        for chunk in reader:
+            rows += len(chunk)
+            if dropna:
+                chunk = chunk.dropna()
+            out = {}
+            for col in adult_columns:
+                values = chunk[col]
+                if col in categories:
+                    if col == "income":
+                        values = values.str.rstrip(".")
+                    out[col] = _encode(values, categories[col])
+                elif dropna:
+                    out[col] = values.to_numpy(dtype=adult_numeric[col])
+                else:
+                    out[col] = values.to_numpy(dtype=np.float64)
+            yield pd.DataFrame(out, index=chunk.index + offset)
+        offset += rows
+
+def _row_masks(df):
+    '''
+    All cleaning masks in one pass over the frame's dtype blocks:
+    duplicated (by 64-bit row hash), has a missing value, all-zero.
+    '''
+    duplicated = pd.Series(pd.util.hash_pandas_object(df, index=False).to_numpy()).duplicated().to_numpy()
+    missing = np.zeros(len(df), dtype=bool)
+    nonzero = np.zeros(len(df), dtype=bool)
+    # bool columns count as numbers, as in (df != 0): False is a zero
+    numeric = df.select_dtypes(include=["number", "bool"])
+    for dtype, cols in numeric.columns.groupby(numeric.dtypes).items():
+        block = df[cols].to_numpy()
+        if block.dtype.kind == "f":
+            missing |= np.isnan(block).any(axis=1)
+        nonzero |= (block != 0).any(axis=1)
+    other = df.columns.difference(numeric.columns, sort=False)
+    if len(other):
+        missing |= df[other].isna().to_numpy().any(axis=1)
+        # A present non-numeric value never equals 0
+        nonzero[:] = True
+    return duplicated, missing, nonzero
+
+@profiled("data_cleaning")
+def data_cleaning(df, data=None, inplace=False, report=False):
+    '''
+    Drop duplicated rows, rows with a missing value and all-zero rows, and the
+    SMILES column when data is given (the DIA files).
+
+    The three row masks come from one pass (_row_masks) and one filter is
+    applied at the end, instead of one new frame per rule. With inplace=True
+    df itself is filtered and returned; if no row or column has to go, df is
+    returned untouched in either mode.
+    With report=True returns (df, report) where report counts the rows each
+    rule dropped, in rule order: duplicates, missing, all_zero.
+    '''
+    duplicated, missing, nonzero = _row_masks(df)
+    keep = ~duplicated & ~missing & nonzero
+    counts = {
+        "rows_in": len(df),
+        "duplicates": int(duplicated.sum()),
+        "missing": int((~duplicated & missing).sum()),
+        "all_zero": int((~duplicated & ~missing & ~nonzero).sum()),
+        "rows_out": int(keep.sum()),
+    }
+
+    drop_cols = ["SMILES"] if data is not None and "SMILES" in df.columns else []
+    if not keep.all() or drop_cols:
+        if inplace:
+            # Drop by position: with repeated index labels a drop by label would also hit kept rows
+            index = df.index
+            df.reset_index(drop=True, inplace=True)
+            df.drop(index=np.flatnonzero(~keep), columns=drop_cols, inplace=True)
+            df.index = index[keep]
+        else:
+            df = df.loc[keep].drop(columns=drop_cols)
+
+    if report:
+        return df, counts
     return df
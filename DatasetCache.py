@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+'''
+Columnar binary cache for the descriptor CSVs in the Datasets folder.
+
+The first load of a CSV parses it once and writes, under cache_dir:
+    features.npy  - float32 (n_rows, n_features) matrix of the numeric columns,
+                    stored column-major so each column is one contiguous run
+    frame-<dtype>.npy - the same columns with the dtypes pd.read_csv gave
+                    them (int64 counts, float64 descriptors), one column-major
+                    block per dtype
+    label.npy     - the label column
+    text.json     - the text columns (SMILES), kept out of the matrix
+    meta.json     - column names, order and dtypes, and the source path/mtime/size
+Later loads memory-map the .npy files (np.load(mmap_mode="r")), so nothing is
+parsed or copied until a value is read, and load_columns only touches the
+pages of the requested columns. The float32 matrix serves the feature
+readers (load_columns, DIAHelper.select); to_dataframe / load_dataframe
+rebuild the DataFrame from the frame blocks, so it has the same values and
+dtypes as pd.read_csv.
+
+Entries are keyed by source path + mtime + size and the cache format;
+editing or replacing the CSV makes a new entry and the stale one for the
+same path is removed.
+'''
+
+CACHE_DIR = ".dataset_cache"
+FORMAT_VERSION = 2
+
+
+class ColumnarDataset:
+    def __init__(self, features, labels, text, columns, feature_columns, label_col, blocks=None):
+        self.features = features                # (n_rows, n_features) float32 memmap
+        self.blocks = blocks or []              # [(memmap, columns)], the feature columns in their CSV dtypes
+        self.labels = labels                    # (n_rows,) memmap, or None
+        self.text = text                        # {column: list of str}
+        self.columns = columns                  # original column order of the CSV
+        self.feature_columns = feature_columns
+        self.label_col = label_col
+
+    def __len__(self):
+        return self.features.shape[0]
+
+    def to_dataframe(self):
+        # One writable copy per dtype block, put back in CSV column order
+        if self.blocks:
+            df = pd.concat([pd.DataFrame(np.array(block), columns=cols, copy=False) for block, cols in self.blocks],
+                           axis=1)[self.feature_columns]
+        else:
+            df = pd.DataFrame(index=pd.RangeIndex(len(self)))
+        if self.labels is not None:
+            df.insert(0, self.label_col, self.labels)
+        for col, values in self.text.items():
+            df.insert(self.columns.index(col), col, values)
+        return df
+
+
+def _path_hash(path):
+    return hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:10]
+
+
+def cache_key(path):
+    stat = os.stat(path)
+    stamp = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}|{FORMAT_VERSION}"
+    return hashlib.sha1(stamp.encode("utf-8")).hexdigest()[:16]
+
+
+def cache_entry(path, cache_dir=CACHE_DIR):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}-{_path_hash(path)}-{cache_key(path)}")
+
+
+def build_cache(path, cache_dir=CACHE_DIR, label_col="Label", text_cols=("SMILES",)):
+    '''Parse the CSV once and write its columnar cache entry. Returns the entry directory.'''
+    df = pd.read_csv(path)
+    text_cols = [col for col in text_cols if col in df.columns]
+    has_label = label_col in df.columns
+    feature_columns = [col for col in df.columns if col not in text_cols and col != label_col]
+
+    entry = cache_entry(path, cache_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write into a temporary directory and rename it, so a concurrent reader
+    # never sees a half-written entry
+    tmp = tempfile.mkdtemp(dir=cache_dir)
+    try:
+        np.save(os.path.join(tmp, "features.npy"), np.asfortranarray(df[feature_columns].to_numpy(dtype=np.float32)))
+        dtypes = {col: df[col].dtype.name for col in feature_columns}
+        for dtype in dict.fromkeys(dtypes.values()):
+            cols = [col for col in feature_columns if dtypes[col] == dtype]
+            np.save(os.path.join(tmp, f"frame-{dtype}.npy"), np.asfortranarray(df[cols].to_numpy(dtype=dtype)))
+        if has_label:
+            np.save(os.path.join(tmp, "label.npy"), df[label_col].to_numpy())
+        with open(os.path.join(tmp, "text.json"), "w", encoding="utf-8") as f:
+            json.dump({col: df[col].astype(str).tolist() for col in text_cols}, f)
+        stat = os.stat(path)
+        meta = {
+            "source": os.path.abspath(path), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+            "columns": list(df.columns), "feature_columns": feature_columns, "dtypes": dtypes,
+            "label_col": label_col if has_label else None,
+        }
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        try:
+            os.replace(tmp, entry)
+        except OSError:
+            # Another process published the same entry first
+            shutil.rmtree(tmp, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    _remove_stale(path, entry, cache_dir)
+    return entry
+
+
+def _remove_stale(path, entry, cache_dir):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    prefix = f"{stem}-{_path_hash(path)}-"
+    for name in os.listdir(cache_dir):
+        full = os.path.join(cache_dir, name)
+        if name.startswith(prefix) and full != entry:
+            shutil.rmtree(full, ignore_errors=True)
+
+
+def load_columnar(path, cache_dir=CACHE_DIR, label_col="Label", text_cols=("SMILES",)):
+    '''Load a CSV through the cache, building the entry on the first call.'''
+    entry = cache_entry(path, cache_dir)
+    if not os.path.exists(os.path.join(entry, "meta.json")):
+        entry = build_cache(path, cache_dir, label_col, text_cols)
+
+    with open(os.path.join(entry, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    with open(os.path.join(entry, "text.json"), encoding="utf-8") as f:
+        text = json.load(f)
+    features = np.load(os.path.join(entry, "features.npy"), mmap_mode="r")
+    labels = np.load(os.path.join(entry, "label.npy"), mmap_mode="r") if meta["label_col"] else None
+    blocks = []
+    for dtype in dict.fromkeys(meta["dtypes"].values()):
+        cols = [col for col in meta["feature_columns"] if meta["dtypes"][col] == dtype]
+        blocks.append((np.load(os.path.join(entry, f"frame-{dtype}.npy"), mmap_mode="r"), cols))
+    return ColumnarDataset(features, labels, text, meta["columns"], meta["feature_columns"], meta["label_col"],
+                           blocks)
+
+
+def load_dataframe(path, cache_dir=CACHE_DIR, label_col="Label", text_cols=("SMILES",)):
+    '''Cached drop-in for pd.read_csv on the DIA descriptor CSVs: same columns, values and dtypes.'''
+    return load_columnar(path, cache_dir, label_col, text_cols).to_dataframe()
+
+
+def read_header(path, cache_dir=CACHE_DIR):
+    '''Column names of a CSV, from its cache entry if there is one, else from the header line.'''
+    if cache_dir is not None:
+        meta_path = os.path.join(cache_entry(path, cache_dir), "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                return json.load(f)["columns"]
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def load_columns(path, columns, cache_dir=CACHE_DIR, label_col="Label", text_cols=("SMILES",)):
+    '''
+    Projection pushdown: read only the named numeric columns of a CSV.
+    With a cache only those columns are read from the memmap; with
+    cache_dir=None the CSV is parsed with usecols.
+    Returns a C-contiguous float32 (n_rows, len(columns)) array, in the
+    requested order, ready for torch.from_numpy.
+    '''
+    columns = list(columns)
+    bad = [col for col in columns if col in text_cols]
+    if bad:
+        raise ValueError(f"Text columns cannot be loaded as features: {bad}")
+
+    if cache_dir is None:
+        df = pd.read_csv(path, usecols=columns)
+        return np.ascontiguousarray(df[columns].to_numpy(dtype=np.float32))
+
+    data = load_columnar(path, cache_dir, label_col, text_cols)
+    position = {col: i for i, col in enumerate(data.feature_columns)}
+    missing = [col for col in columns if col not in position and col != data.label_col]
+    if missing:
+        raise KeyError(f"Columns not in {path}: {missing}")
+
+    out = np.empty((len(data), len(columns)), dtype=np.float32)
+    for j, col in enumerate(columns):
+        out[:, j] = data.labels if col == data.label_col else data.features[:, position[col]]
+    return out
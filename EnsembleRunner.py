@@ -0,0 +1,191 @@
+import os
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import torch
+import torch.nn as nn
+
+from Preprocessing import PreprocessingPipeline
+from Trainer import Trainer
+
+'''
+Parallel training and inference for the Ensemble Quantum-Classical Hybrid.
+
+The ensemble is N HybridQNN members (qnn_model_<i>.pth) plus a random forest
+(rf_model.joblib) and a logistic regression (logistic_model.joblib) on the
+same scaler -> PCA features. Every member runs in its
+own worker process; each worker loads the shared preprocessing once, in the
+pool initializer, and only receives the raw feature rows. The preprocessing
+is model_dir/preprocessing.npz (see Preprocessing.py), or scaler.pkl/pca.pkl
+when there is no artifact.
+
+Member i is always seeded with seed + i, whichever process runs it, so
+n_workers=0 (in-process, one member after another) and the pool give the
+same weights and the same predictions.
+
+The QNN members run on PennyLane's default.qubit; device="numpy" puts them
+on the batched simulator instead (see QuantumLayers.HybridQNN).
+
+Predictions are combined by soft voting: the mean QNN probability gets
+qnn_weight and the random forest and the logistic regression split the rest
+evenly, so the default qnn_weight=0.5 is the notebook's
+0.5 * QNN + 0.25 * LR + 0.25 * RF.
+
+The defaults match the shipped members (6 layers behind a Linear pre-layer).
+fit() will not replace existing member files unless overwrite=True.
+
+Usage (the pool uses "spawn", so scripts need an if __name__ == "__main__" guard):
+    runner = EnsembleRunner("models/Ensemble Quantum-Classical Hybrid")
+    probs = runner.predict_proba(X_test_df)
+    runner.fit(X_train_df, y_train, overwrite=True)   # retrains and replaces the shipped members
+'''
+
+
+# Per-process state, filled by _init_worker
+_preprocess = None
+
+
+def _init_worker(model_dir, n_threads):
+    global _preprocess
+    if n_threads is not None:
+        torch.set_num_threads(n_threads)
+    artifact = os.path.join(model_dir, "preprocessing.npz")
+    if os.path.exists(artifact):
+        _preprocess = PreprocessingPipeline.load(artifact)
+    else:
+        _preprocess = PreprocessingPipeline.from_sklearn(
+            joblib.load(os.path.join(model_dir, "scaler.pkl")),
+            joblib.load(os.path.join(model_dir, "pca.pkl")),
+        )
+
+
+def _features(X):
+    return _preprocess.transform(X)
+
+
+def _seed_everything(seed):
+    torch.manual_seed(seed)
+    np.random.seed(seed)
+
+
+def _train_member(member, X, y, config):
+    kind, idx, seed, path = member
+    _seed_everything(seed)
+    features = _features(X)
+
+    if kind == "rf":
+        from sklearn.ensemble import RandomForestClassifier
+
+        model = RandomForestClassifier(n_estimators=config["n_estimators"], random_state=seed)
+        model.fit(features, y)
+        joblib.dump(model, path)
+        return path
+    if kind == "lr":
+        from sklearn.linear_model import LogisticRegression
+
+        model = LogisticRegression(solver="lbfgs", max_iter=1000, random_state=seed)
+        model.fit(features, y)
+        joblib.dump(model, path)
+        return path
+
+    from QuantumLayers import HybridQNN
+
+    model = HybridQNN(config["n_qubits"], config["n_layers"], pre=config["pre"], device=config["device"])
+    trainer = Trainer(model, torch.optim.Adam(model.parameters(), lr=config["lr"]), nn.BCEWithLogitsLoss(),
+                      batch_size=config["batch_size"], epochs=config["epochs"], seed=seed)
+    trainer.fit(features, y)
+    torch.save(model.state_dict(), path)
+    return path
+
+
+def _predict_member(member, X, device="default.qubit"):
+    kind, idx, seed, path = member
+    features = _features(X)
+    if kind in ("rf", "lr"):
+        return joblib.load(path).predict_proba(features)[:, 1]
+
+    from QuantumLayers import HybridQNN
+
+    model = HybridQNN.from_state_dict(torch.load(path), device=device)
+    model.eval()
+    with torch.no_grad():
+        logits = model(torch.tensor(features, dtype=torch.float32))
+    return torch.sigmoid(logits).numpy().astype(np.float64)
+
+
+class EnsembleRunner:
+    def __init__(self, model_dir: str, n_members: int = 3, n_workers: int = None, seed: int = 42,
+                 qnn_weight: float = 0.5, n_qubits: int = 5, n_layers: int = 6, pre: bool = True,
+                 epochs: int = 15, batch_size: int = 32, lr: float = 1e-2, n_estimators: int = 100,
+                 device: str = "default.qubit"):
+        if n_members < 1:
+            raise ValueError("n_members must be at least 1.")
+        if not 0.0 <= qnn_weight <= 1.0:
+            raise ValueError("qnn_weight must be between 0 and 1.")
+        self.model_dir = model_dir
+        self.n_members = n_members
+        # One worker per member (QNNs, random forest, logistic regression), capped by the core count; 0 runs in-process
+        self.n_workers = min(n_members + 2, os.cpu_count() or 1) if n_workers is None else n_workers
+        self.seed = seed
+        self.qnn_weight = qnn_weight
+        self.config = {
+            "n_qubits": n_qubits, "n_layers": n_layers, "pre": pre, "epochs": epochs,
+            "batch_size": batch_size, "lr": lr, "n_estimators": n_estimators, "device": device,
+        }
+
+    def members(self):
+        members = [
+            ("qnn", i, self.seed + i, os.path.join(self.model_dir, f"qnn_model_{i}.pth"))
+            for i in range(self.n_members)
+        ]
+        members.append(("rf", self.n_members, self.seed + self.n_members, os.path.join(self.model_dir, "rf_model.joblib")))
+        members.append(("lr", self.n_members + 1, self.seed + self.n_members + 1,
+                        os.path.join(self.model_dir, "logistic_model.joblib")))
+        return members
+
+    def _map(self, fn, members, *args):
+        if self.n_workers == 0:
+            _init_worker(self.model_dir, None)
+            return [fn(member, *args) for member in members]
+        # Workers get one thread each so N members use N cores without oversubscription
+        with ProcessPoolExecutor(
+            max_workers=self.n_workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_dir, 1),
+        ) as pool:
+            futures = [pool.submit(fn, member, *args) for member in members]
+            return [future.result() for future in futures]
+
+    def fit(self, X, y, overwrite: bool = False, kinds=None):
+        '''
+        Train every member on the raw feature rows X (the columns the
+        preprocessing was fitted on) and labels y, and save them into model_dir.
+        kinds ("qnn", "rf", "lr") trains only members of those kinds.
+        Existing member files are only replaced with overwrite=True.
+        Returns the saved paths in member order.
+        '''
+        members = [member for member in self.members() if kinds is None or member[0] in kinds]
+        existing = [path for kind, idx, seed, path in members if os.path.exists(path)]
+        if existing and not overwrite:
+            raise FileExistsError(f"{len(existing)} member files already exist in {self.model_dir} "
+                                  f"(e.g. {existing[0]}); pass overwrite=True to replace them.")
+        y = np.asarray(y)
+        return self._map(_train_member, members, X, y, self.config)
+
+    def member_proba(self, X):
+        '''Positive-class probability of every member, shape (n_members + 2, n_samples).'''
+        return np.stack(self._map(_predict_member, self.members(), X, self.config["device"]))
+
+    def vote(self, probs):
+        # Soft voting: qnn_weight on the mean QNN probability, the rest split evenly between RF and LR
+        qnn_probs, classical_probs = probs[:self.n_members], probs[self.n_members:]
+        return self.qnn_weight * qnn_probs.mean(axis=0) + (1.0 - self.qnn_weight) * classical_probs.mean(axis=0)
+
+    def predict_proba(self, X):
+        return self.vote(self.member_proba(X))
+
+    def predict(self, X, threshold: float = 0.5):
+        return (self.predict_proba(X) >= threshold).astype(int)
@@ -0,0 +1,281 @@
+import argparse
+import json
+import pickle
+import queue
+import sys
+import threading
+import time
+import types
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import joblib
+import numpy as np
+import torch
+import torch.nn as nn
+
+from EnsembleRunner import EnsembleRunner
+from Preprocessing import PreprocessingPipeline
+from QuantumLayers import HybridQNN
+
+'''
+Inference service for the saved DIA models.
+
+Every model in models/ is loaded once at startup (ModelBank) and scored
+together on each batch:
+    full_classical - full classical/model_FullClassical.pth, on the raw 196 descriptors
+    hybrid_qnn     - quantum-hybrid simple encoding/hybrid_qnn_dia.pth
+    logistic       - quantum-hybrid simple encoding/logistic_model.pth
+    random_forest  - quantum-hybrid simple encoding/rf_model.pth
+    ensemble       - Ensemble Quantum-Classical Hybrid: qnn_model_*.pth + rf_model.joblib
+                     + logistic_model.joblib, soft voting (0.5 QNN, 0.25 RF, 0.25 LR)
+The PCA models share the Ensemble preprocessing.npz (both notebooks fit the same
+scaler + PCA), and the QNNs run on the batched numpy simulator.
+
+Concurrent requests go through a MicroBatcher: rows that arrive within
+max_delay of the first waiting request are stacked and scored in one
+vectorized pass, then split back per request.
+
+    python -m InferenceServer --port 8000 --max-delay-ms 5
+    POST /predict  {"rows": [[196 descriptors], ...] or [{"BalabanJ": ..., ...}], "models": [...]}
+    GET  /health
+
+With --stdin the service reads one JSON request per line and writes one
+JSON response per line instead.
+'''
+
+MODELS_DIR = "models"
+
+
+# ---Models---
+class FullClassical(nn.Module):
+    # Same layers as in full classical.ipynb; needed to unpickle model_FullClassical.pth
+    def __init__(self, input_dim, output_dim):
+        super(FullClassical, self).__init__()
+        self.fc1 = nn.Linear(input_dim, 128)
+        self.fc2 = nn.Linear(128, 64)
+        self.fc3 = nn.Linear(64, 32)
+        self.fc4 = nn.Linear(32, 16)
+        self.fc5 = nn.Linear(16, output_dim)
+        self.relu = nn.ReLU()
+        self.softmax = nn.Softmax(dim=1)
+
+    def forward(self, x):
+        x = self.relu(self.fc1(x))
+        x = self.relu(self.fc2(x))
+        x = self.relu(self.fc3(x))
+        x = self.relu(self.fc4(x))
+        return self.softmax(self.fc5(x))
+
+
+class _NotebookUnpickler(pickle.Unpickler):
+    # The notebook pickled the whole module with its class living in __main__
+    def find_class(self, module, name):
+        if module == "__main__" and name == "FullClassical":
+            return FullClassical
+        return super().find_class(module, name)
+
+
+_notebook_pickle = types.SimpleNamespace(__name__="pickle", Unpickler=_NotebookUnpickler, load=pickle.load)
+
+
+class ModelBank:
+    def __init__(self, models_dir: str = MODELS_DIR):
+        ensemble_dir = f"{models_dir}/Ensemble Quantum-Classical Hybrid"
+        simple_dir = f"{models_dir}/quantum-hybrid simple encoding"
+
+        self.preprocessing = PreprocessingPipeline.load(f"{ensemble_dir}/preprocessing.npz")
+        self.columns = self.preprocessing.columns
+
+        self.full_classical = torch.load(
+            f"{models_dir}/full classical/model_FullClassical.pth",
+            map_location="cpu", weights_only=False, pickle_module=_notebook_pickle,
+        ).eval()
+        self.hybrid_qnn = HybridQNN.from_state_dict(torch.load(f"{simple_dir}/hybrid_qnn_dia.pth"), device="numpy").eval()
+        self.logistic = torch.load(f"{simple_dir}/logistic_model.pth", weights_only=False)
+        self.random_forest = torch.load(f"{simple_dir}/rf_model.pth", weights_only=False)
+
+        self.ensemble = EnsembleRunner(ensemble_dir)
+        self.ensemble_qnns = [
+            HybridQNN.from_state_dict(torch.load(path), device="numpy").eval()
+            for kind, idx, seed, path in self.ensemble.members() if kind == "qnn"
+        ]
+        # Random forest and logistic regression, in member order
+        self.ensemble_classical = [
+            joblib.load(path) for kind, idx, seed, path in self.ensemble.members() if kind != "qnn"
+        ]
+
+        self.names = ["full_classical", "hybrid_qnn", "logistic", "random_forest", "ensemble"]
+
+    @staticmethod
+    def _qnn_proba(model, features):
+        return torch.sigmoid(model(torch.as_tensor(features, dtype=torch.float32))).numpy().astype(np.float64)
+
+    def parse_rows(self, rows):
+        '''Rows as lists in descriptor order, or as {column: value} dicts -> (n, 196) float64.'''
+        if not rows:
+            raise ValueError("rows must contain at least one row.")
+        if isinstance(rows[0], dict):
+            rows = [[row[col] for col in self.columns] for row in rows]
+        X = np.asarray(rows, dtype=np.float64).reshape(len(rows), -1)
+        if X.shape[1] != len(self.columns):
+            raise ValueError(f"Expected {len(self.columns)} descriptors per row, got {X.shape[1]}.")
+        return X
+
+    def predict(self, X):
+        '''Positive-class probability of every model for a (n, 196) batch, in one pass per model.'''
+        features = self.preprocessing.transform(X)
+        with torch.no_grad():
+            full = self.full_classical(torch.as_tensor(X, dtype=torch.float32))[:, 1].numpy().astype(np.float64)
+            hybrid = self._qnn_proba(self.hybrid_qnn, features)
+            members = [self._qnn_proba(model, features) for model in self.ensemble_qnns]
+        members += [model.predict_proba(features)[:, 1] for model in self.ensemble_classical]
+        return {
+            "full_classical": full,
+            "hybrid_qnn": hybrid,
+            "logistic": self.logistic.predict_proba(features)[:, 1],
+            "random_forest": self.random_forest.predict_proba(features)[:, 1],
+            "ensemble": self.ensemble.vote(np.stack(members)),
+        }
+
+
+# ---Micro-batching---
+class MicroBatcher:
+    def __init__(self, fn, max_delay: float = 0.005, max_batch: int = 1024):
+        self.fn = fn
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, X):
+        future = Future()
+        self._queue.put((X, future))
+        return future
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self):
+        # Block for the first request, then take whatever arrives until max_delay or max_batch
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch, rows = [first], first[0].shape[0]
+        deadline = time.monotonic() + self.max_delay
+        while rows < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)
+                break
+            batch.append(item)
+            rows += item[0].shape[0]
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            try:
+                results = self.fn(np.concatenate([X for X, _ in batch]))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            start = 0
+            for X, future in batch:
+                stop = start + X.shape[0]
+                future.set_result({name: values[start:stop] for name, values in results.items()})
+                start = stop
+
+
+# ---Frontends---
+def handle_request(bank, batcher, request):
+    models = request.get("models") or bank.names
+    unknown = [name for name in models if name not in bank.names]
+    if unknown:
+        raise ValueError(f"Unknown models: {unknown}")
+    X = bank.parse_rows(request["rows"])
+    results = batcher.submit(X).result()
+    return {"n": X.shape[0], "predictions": {name: results[name].tolist() for name in models}}
+
+
+def make_handler(bank, batcher):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path != "/health":
+                return self._send(404, {"error": "not found"})
+            self._send(200, {"status": "ok", "models": bank.names, "n_features": len(bank.columns)})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                return self._send(404, {"error": "not found"})
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                self._send(200, handle_request(bank, batcher, request))
+            except (ValueError, KeyError, TypeError) as e:
+                self._send(400, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+class InferenceHTTPServer(ThreadingHTTPServer):
+    # The default listen backlog of 5 drops connections under concurrent load
+    request_queue_size = 128
+
+
+def serve_stdin(bank, batcher):
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            response = handle_request(bank, batcher, json.loads(line))
+        except (ValueError, KeyError, TypeError) as e:
+            response = {"error": str(e)}
+        print(json.dumps(response), flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DIA model inference service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--max-delay-ms", type=float, default=5.0, help="how long a batch waits for more requests")
+    parser.add_argument("--max-batch", type=int, default=1024, help="rows per vectorized pass")
+    parser.add_argument("--stdin", action="store_true", help="read JSON requests from stdin instead of HTTP")
+    args = parser.parse_args()
+
+    bank = ModelBank(args.models_dir)
+    batcher = MicroBatcher(bank.predict, args.max_delay_ms / 1000, args.max_batch)
+    if args.stdin:
+        serve_stdin(bank, batcher)
+    else:
+        server = InferenceHTTPServer((args.host, args.port), make_handler(bank, batcher))
+        print(f"Serving {', '.join(bank.names)} on http://{args.host}:{args.port}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            batcher.close()
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from Profiler import profiled
+
+'''
+Fitted StandardScaler + PCA preprocessing, shared by the DIA model notebooks.
+
+fit() runs sklearn once; the result is kept as plain NumPy arrays
+    mean, scale             - StandardScaler.mean_ / scale_
+    pca_mean, components    - PCA.mean_ / components_
+and saved as a versioned .npz artifact named after a hash of the training
+data and the settings, so refitting on the same data just loads the file.
+With pca_rows the scaler is fitted on all of X and PCA only on those rows,
+as the DIA notebooks do (scaler on the full training set, PCA on its
+training split).
+
+transform() needs neither sklearn nor the intermediate scaled matrix: the
+scaler and the projection are folded into one weight matrix and a bias,
+    ((X - mean) / scale - pca_mean) @ components.T == X @ W - b
+so new data costs a single matmul.
+'''
+
+FORMAT_VERSION = 1
+ARTIFACT_DIR = "models/preprocessing"
+
+
+def dataset_key(X, columns=None, n_components=5, seed=42, pca_rows=None):
+    h = hashlib.sha1()
+    h.update(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    if pca_rows is not None:
+        h.update(np.ascontiguousarray(pca_rows, dtype=np.int64).tobytes())
+    h.update(json.dumps({
+        "shape": list(np.shape(X)), "columns": list(columns) if columns is not None else None,
+        "n_components": n_components, "seed": seed, "version": FORMAT_VERSION,
+    }).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+class PreprocessingPipeline:
+    def __init__(self, mean, scale, pca_mean, components, columns=None, key=None, settings=None):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.pca_mean = np.asarray(pca_mean, dtype=np.float64)
+        self.components = np.asarray(components, dtype=np.float64)
+        self.columns = list(columns) if columns is not None else None
+        self.key = key
+        self.settings = settings or {}
+        # Fused scaler + projection
+        self.weight = (self.components / self.scale).T
+        self.bias = (self.mean / self.scale + self.pca_mean) @ self.components.T
+
+    @property
+    def n_components(self):
+        return self.components.shape[0]
+
+    # ---Fitting---
+    @classmethod
+    @profiled("preprocessing.fit")
+    def fit(cls, X, columns=None, n_components=5, seed=42, pca_rows=None):
+        from sklearn.decomposition import PCA
+        from sklearn.preprocessing import StandardScaler
+
+        X = np.asarray(X, dtype=np.float64)
+        scaler = StandardScaler().fit(X)
+        scaled = scaler.transform(X)
+        pca = PCA(n_components=n_components, random_state=seed).fit(scaled if pca_rows is None else scaled[pca_rows])
+        return cls.from_sklearn(scaler, pca, columns, key=dataset_key(X, columns, n_components, seed, pca_rows),
+                                settings={"n_components": n_components, "seed": seed})
+
+    @classmethod
+    def from_sklearn(cls, scaler, pca, columns=None, key=None, settings=None):
+        # Reads the fitted attributes only, so sklearn is needed just to unpickle
+        if columns is None and hasattr(scaler, "feature_names_in_"):
+            columns = list(scaler.feature_names_in_)
+        return cls(scaler.mean_, scaler.scale_, pca.mean_, pca.components_, columns, key, settings)
+
+    @classmethod
+    def fit_or_load(cls, X, columns=None, n_components=5, seed=42, artifact_dir=ARTIFACT_DIR, pca_rows=None):
+        '''Load the artifact for this data and settings if it was saved before, else fit and save it.'''
+        X = np.asarray(X, dtype=np.float64)
+        key = dataset_key(X, columns, n_components, seed, pca_rows)
+        path = os.path.join(artifact_dir, f"preprocessing-{key}.npz")
+        if os.path.exists(path):
+            return cls.load(path)
+        pipeline = cls.fit(X, columns, n_components, seed, pca_rows)
+        pipeline.save(path)
+        return pipeline
+
+    # ---Artifact---
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        meta = {"version": FORMAT_VERSION, "columns": self.columns, "key": self.key, "settings": self.settings}
+        np.savez(path, mean=self.mean, scale=self.scale, pca_mean=self.pca_mean,
+                 components=self.components, meta=np.array(json.dumps(meta)))
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta["version"] != FORMAT_VERSION:
+                raise ValueError(f"Unsupported preprocessing artifact version {meta['version']} in {path}.")
+            return cls(data["mean"], data["scale"], data["pca_mean"], data["components"],
+                       meta["columns"], meta["key"], meta["settings"])
+
+    # ---Inference---
+    @profiled("preprocessing.transform")
+    def transform(self, X):
+        '''
+        (n_samples, n_features) array or DataFrame -> (n_samples, n_components).
+        A DataFrame is reordered to the fitted columns first.
+        '''
+        if self.columns is not None and hasattr(X, "columns"):
+            X = X[self.columns]
+        X = np.asarray(X, dtype=np.float64)
+        if X.shape[-1] != self.weight.shape[0]:
+            raise ValueError(f"Expected {self.weight.shape[0]} features, got {X.shape[-1]}.")
+        return X @ self.weight - self.bias
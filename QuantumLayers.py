@@ -0,0 +1,344 @@
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.autograd import Function
+
+from CircuitRegistry import registry
+from Profiler import profiler
+from VQASimulator import ShotSampler, shifted_parameters, split_shifted_expvals
+
+'''
+PyTorch layers for the variational quantum classifier used in skeleton.ipynb.
+
+The layer supports three backends:
+    "numpy"  - the batched statevector simulator in VQASimulator.py; one call
+               evaluates the whole (batch, n_qubits) input
+    "qiskit" - the reference path on Qiskit's StatevectorEstimator; a
+               ParameterVector template of the ansatz, with the whole batch
+               bound in one estimator job
+    "shots"  - finite-shot estimates from the numpy statevectors
+               (VQASimulator.ShotSampler); chosen by passing shots=
+
+and two gradient methods, plus a default that picks one (diff_method):
+    "adjoint"         - adjoint differentiation on the numpy statevector;
+                        the backward pass costs about one forward pass
+    "parameter-shift" - all +-pi/2 shifts of the inputs and weights for the
+                        batch stacked into one backend call
+    "best"            - adjoint on "numpy", parameter-shift otherwise; with
+                        shots the parameter-shift terms get adaptively
+                        allocated shot counts
+Gradients flow to the inputs as well, so the classical layer in front of the
+quantum layer is trained too.
+
+HybridQNN is the PennyLane model of the Ensemble Quantum-Classical Hybrid
+notebook (qnn_model_*.pth). Its QNode indexes inputs[..., i], so a whole
+(batch, n_qubits) input goes through parameter broadcasting in one device
+execution instead of one QNode call per sample. default.qubit with backprop
+simulates the broadcast natively; lightning.qubit with adjoint (the notebook's
+original device) splits it back into per-sample tapes inside one execute call.
+device="numpy" runs the same circuit on the batched simulator above, without
+PennyLane.
+
+Simulators, Qiskit templates and QNodes are built once per
+(n_qubits, n_layers) and shared through CircuitRegistry.registry.
+'''
+
+
+# ---Qiskit reference path---
+class QiskitAnsatz:
+    '''
+    The ansatz as one parameterized QuantumCircuit: ParameterVector "x" for the
+    inputs and "w" for the flattened (n_layers, n_qubits, 3) weights. Built
+    once per structure by compile_qiskit_ansatz; calls only bind values.
+    '''
+    def __init__(self, circuit, observable, n_qubits, n_layers, order):
+        self.circuit = circuit
+        self.observable = observable
+        self.n_qubits = n_qubits
+        self.n_layers = n_layers
+        # Qiskit binds arrays in circuit.parameters order (sorted by name);
+        # order maps that onto [inputs, weights]
+        self.order = order
+
+    def values(self, input_vals, weight_vals):
+        '''(batch, n_params) parameter values for a batch; weights shared or per-sample.'''
+        input_vals = np.atleast_2d(np.asarray(input_vals, dtype=np.float64))
+        weight_vals = np.asarray(weight_vals, dtype=np.float64)
+        batch = input_vals.shape[0]
+        flat_w = weight_vals.reshape(batch, -1) if weight_vals.ndim == 4 else np.broadcast_to(weight_vals.reshape(1, -1), (batch, weight_vals.size))
+        return np.concatenate([input_vals, flat_w], axis=1)[:, self.order]
+
+    def bind(self, input_data, weights):
+        return self.circuit.assign_parameters(self.values(input_data, weights)[0])
+
+
+def compile_qiskit_ansatz(n_qubits: int, n_layers: int):
+    from qiskit import QuantumCircuit
+    from qiskit.circuit import ParameterVector
+    from qiskit.quantum_info import SparsePauliOp
+
+    x = ParameterVector("x", n_qubits)
+    w = ParameterVector("w", n_layers * n_qubits * 3)
+    qc = QuantumCircuit(n_qubits)
+    for wire in range(n_qubits):
+        qc.ry(x[wire], wire)
+    for layer in range(n_layers):
+        for wire in range(n_qubits):
+            phi, theta, omega = w[3 * (layer * n_qubits + wire):3 * (layer * n_qubits + wire) + 3]
+            # Rot(phi, theta, omega) = RZ(omega) RY(theta) RZ(phi)
+            qc.rz(phi, wire)
+            qc.ry(theta, wire)
+            qc.rz(omega, wire)
+        if n_qubits > 1:
+            for wire in range(n_qubits - 1):
+                qc.cx(wire, wire + 1)
+            qc.cx(n_qubits - 1, 0)
+    position = {param: i for i, param in enumerate(list(x) + list(w))}
+    order = np.array([position[param] for param in qc.parameters], dtype=np.intp)
+    # Qiskit strings are little-endian: the last character acts on qubit 0
+    observable = SparsePauliOp("I" * (n_qubits - 1) + "Z")
+    return QiskitAnsatz(qc, observable, n_qubits, n_layers, order)
+
+
+def qiskit_ansatz(n_qubits: int, n_layers: int):
+    return registry.get("qiskit", (n_qubits, n_layers), lambda: compile_qiskit_ansatz(n_qubits, n_layers))
+
+
+def create_vqa_circuit(input_data, weights):
+    n_qubits = len(input_data)
+    weights = np.asarray(weights, dtype=np.float64).reshape(-1, n_qubits, 3)
+    return qiskit_ansatz(n_qubits, weights.shape[0]).bind(input_data, weights)
+
+
+def qiskit_expval(input_vals, weight_vals):
+    from qiskit.primitives import StatevectorEstimator
+
+    input_vals = np.atleast_2d(input_vals)
+    n_qubits = input_vals.shape[1]
+    # weight_vals is shared by the batch or given per sample, (batch, n_layers, n_qubits, 3)
+    weight_vals = np.asarray(weight_vals, dtype=np.float64)
+    n_layers = weight_vals.shape[1] if weight_vals.ndim == 4 else weight_vals.size // (3 * n_qubits)
+    ansatz = qiskit_ansatz(n_qubits, n_layers)
+    # One estimator job: the template with a (batch, n_params) array of bindings
+    with profiler.stage("qiskit.estimator"):
+        job = StatevectorEstimator().run([(ansatz.circuit, ansatz.observable, ansatz.values(input_vals, weight_vals))])
+        expvals = np.asarray(job.result()[0].data.evs, dtype=np.float64).reshape(-1)
+    profiler.count_circuits(expvals.shape[0])
+    return expvals
+
+
+def _run_backend(backend, simulator, input_vals, weight_vals):
+    if backend in ("numpy", "shots"):
+        return simulator.run(input_vals, weight_vals)
+    if backend == "qiskit":
+        return qiskit_expval(input_vals, weight_vals)
+    raise ValueError(f"Unknown backend: {backend}")
+
+
+def _make_simulator(n_qubits, n_layers, shots=None, adaptive_shots=True, seed=None):
+    # The exact simulator is shared per structure; a sampler keeps its own rng and shot statistics
+    simulator = registry.simulator(n_qubits, n_layers)
+    if shots is None:
+        return simulator
+    return ShotSampler(simulator, shots, adaptive=adaptive_shots, seed=seed)
+
+
+def _gradients(backend, diff_method, simulator, input_vals, weight_vals):
+    if diff_method == "best":
+        diff_method = "adjoint" if backend == "numpy" else "parameter-shift"
+    if diff_method == "adjoint":
+        if backend != "numpy":
+            raise ValueError("diff_method='adjoint' needs the statevector of the numpy backend.")
+        return simulator.adjoint(input_vals, weight_vals)
+    if diff_method == "parameter-shift":
+        if backend == "shots":
+            # Same stacked shifts, with the shot budget split across the terms
+            return simulator.parameter_shift(input_vals, weight_vals)
+        # Every +-pi/2 shifted input and weight for the whole batch, in one backend call
+        weight_vals = weight_vals.reshape(simulator.weight_shape)
+        rows_in, rows_w = shifted_parameters(input_vals, weight_vals)
+        expvals = _run_backend(backend, simulator, rows_in, rows_w)
+        return split_shifted_expvals(expvals, input_vals.shape[0], simulator.n_qubits)
+    raise ValueError(f"Unknown diff_method: {diff_method}")
+
+
+#PyTorch Custom Autograd Function For VQA Layer
+class VQALayerFunction(Function):
+    @staticmethod
+    def forward(ctx, input_tensor, weights, simulator, backend="numpy", diff_method="best"):
+        input_vals = input_tensor.detach().cpu().numpy()
+        weight_vals = weights.detach().cpu().numpy()
+        ctx.save_for_backward(input_tensor, weights)
+        ctx.simulator = simulator
+        ctx.backend = backend
+        ctx.diff_method = diff_method
+
+        with profiler.stage("quantum.forward"):
+            expvals = _run_backend(backend, simulator, input_vals, weight_vals)
+        return torch.tensor(expvals, dtype=input_tensor.dtype, device=input_tensor.device).view(-1, 1)
+
+    @staticmethod
+    def backward(ctx, grad_output):
+        input_tensor, weights = ctx.saved_tensors
+        input_vals = input_tensor.detach().cpu().numpy().astype(np.float64)
+        weight_vals = weights.detach().cpu().numpy().astype(np.float64)
+
+        with profiler.stage("quantum.backward"):
+            input_grads, weight_grads = _gradients(ctx.backend, ctx.diff_method, ctx.simulator, input_vals, weight_vals)
+
+        grad_output = grad_output.view(-1, 1)
+        input_grads = torch.tensor(input_grads, dtype=input_tensor.dtype, device=input_tensor.device)
+        weight_grads = torch.tensor(weight_grads, dtype=weights.dtype, device=weights.device)
+        input_grad = grad_output * input_grads
+        weight_grad = (grad_output * weight_grads).sum(dim=0).view_as(weights)
+        return input_grad, weight_grad, None, None, None
+
+
+#Quantum Layer as PyTorch Module
+class VQALayer(nn.Module):
+    def __init__(self, n_qubits: int = 2, n_layers: int = 1, backend: str = "numpy", diff_method: str = "best",
+                 shots: int = None, adaptive_shots: bool = True, seed: int = None):
+        super().__init__()
+        if shots is not None and backend != "numpy":
+            raise ValueError("shots= samples from the numpy statevector; use backend='numpy'.")
+        self.n_qubits = n_qubits
+        self.n_layers = n_layers
+        self.backend = backend if shots is None else "shots"
+        self.diff_method = diff_method
+        self.simulator = _make_simulator(n_qubits, n_layers, shots, adaptive_shots, seed)
+        self.weights = nn.Parameter(torch.randn(n_layers, n_qubits, 3)) #Rot angles for every layer and wire
+
+    def forward(self, x):
+        if x.ndim == 1:
+            x = x.unsqueeze(0)
+        return VQALayerFunction.apply(x, self.weights, self.simulator, self.backend, self.diff_method)
+
+
+#Full Hybrid Model
+class HybridModel(nn.Module):
+    def __init__(self, input_dim: int, n_qubits: int = 2, n_layers: int = 1, backend: str = "numpy", diff_method: str = "best",
+                 shots: int = None, adaptive_shots: bool = True, seed: int = None):
+        super().__init__()
+        self.classical = nn.Linear(input_dim, n_qubits) #Classic preprocessing layer
+        self.quantum = VQALayer(n_qubits, n_layers, backend, diff_method, shots, adaptive_shots, seed) #VQA layer
+        self.output = nn.Linear(1, 1) #Final classical layer
+
+    def forward(self, x):
+        with profiler.stage("classical.pre"):
+            x = self.classical(x)
+            x = torch.tanh(x)  #Activation before quantum layer
+        x = self.quantum(x)
+        with profiler.stage("classical.head"):
+            x = self.output(x)
+            return torch.sigmoid(x)
+
+
+# ---PennyLane path (Ensemble Quantum-Classical Hybrid)---
+def make_qnode(n_qubits: int = 5, n_layers: int = 4, device: str = "default.qubit", diff_method: str = "backprop"):
+    import pennylane as qml
+
+    dev = qml.device(device, wires=n_qubits)
+
+    @qml.qnode(dev, interface="torch", diff_method=diff_method)
+    def qnode(inputs, weights, shift):
+        # inputs: (n_qubits,) or (batch, n_qubits); a batch is broadcast over the tape
+        # weights: (n_layers, n_qubits, 3), shift: (n_qubits,)
+        for i in range(n_qubits):
+            qml.RY(inputs[..., i] + shift[i], wires=i)
+        for layer in range(n_layers):
+            for wire in range(n_qubits):
+                a, b, c = weights[layer, wire]
+                qml.Rot(a, b, c, wires=wire)
+            if n_qubits > 1:
+                for wire in range(n_qubits - 1):
+                    qml.CNOT(wires=[wire, wire + 1])
+                qml.CNOT(wires=[n_qubits - 1, 0])
+        return qml.expval(qml.PauliZ(0))
+
+    return qnode
+
+
+class ShiftedVQALayer(nn.Module):
+    '''
+    The HybridQNN QNode on the batched numpy simulator, with the same
+    parameter names as its TorchLayer (weights, shift). The trainable shift is
+    added to the inputs, so its gradient is the input gradient of VQALayerFunction.
+    '''
+    def __init__(self, n_qubits: int, n_layers: int, diff_method: str = "best",
+                 shots: int = None, adaptive_shots: bool = True, seed: int = None):
+        super().__init__()
+        self.simulator = _make_simulator(n_qubits, n_layers, shots, adaptive_shots, seed)
+        self.backend = "numpy" if shots is None else "shots"
+        self.diff_method = diff_method
+        # Same uniform [0, 2pi) initialisation as qml.qnn.TorchLayer
+        self.weights = nn.Parameter(2 * np.pi * torch.rand(n_layers, n_qubits, 3))
+        self.shift = nn.Parameter(2 * np.pi * torch.rand(n_qubits))
+
+    def forward(self, x):
+        return VQALayerFunction.apply(x + self.shift, self.weights, self.simulator, self.backend, self.diff_method).view(-1)
+
+
+class HybridQNN(nn.Module):
+    def __init__(self, n_qubits: int = 5, n_layers: int = 4, pre: bool = False,
+                 device: str = "default.qubit", diff_method: str = "backprop", broadcast: bool = True,
+                 shots: int = None, adaptive_shots: bool = True, seed: int = None):
+        super().__init__()
+        if shots is not None and device != "numpy":
+            raise ValueError("shots= samples from the numpy simulator; use device='numpy'.")
+        self.n_qubits = n_qubits
+        self.n_layers = n_layers
+        self.broadcast = broadcast
+        # Optional classical layer in front of the embedding, as in the saved qnn_model_*.pth
+        self.pre = nn.Sequential(nn.Linear(n_qubits, n_qubits), nn.Tanh()) if pre else None
+        if device == "numpy":
+            # No PennyLane needed; always evaluates the whole batch at once.
+            # "backprop" is PennyLane-only, the simulator maps it to adjoint
+            self.qlayer = ShiftedVQALayer(n_qubits, n_layers, "best" if diff_method == "backprop" else diff_method,
+                                          shots, adaptive_shots, seed)
+        else:
+            import pennylane as qml
+
+            weight_shapes = {"weights": (n_layers, n_qubits, 3), "shift": (n_qubits,)}
+            qnode = registry.get("qnode", (n_qubits, n_layers, device, diff_method),
+                                 lambda: make_qnode(n_qubits, n_layers, device, diff_method))
+            self.qlayer = qml.qnn.TorchLayer(qnode, weight_shapes)
+        self.head = nn.Sequential(
+            nn.Linear(1, 16),
+            nn.ReLU(),
+            nn.Linear(16, 1),
+        )
+
+    @classmethod
+    def from_state_dict(cls, state_dict, **kwargs):
+        n_layers, n_qubits, _ = state_dict["qlayer.weights"].shape
+        if "qlayer.shift" not in state_dict:
+            # The simple-encoding model (hybrid_qnn_dia.pth) has a plain AngleEmbedding, i.e. shift = 0
+            state_dict = dict(state_dict, **{"qlayer.shift": torch.zeros(n_qubits)})
+        model = cls(n_qubits, n_layers, pre="pre.0.weight" in state_dict, **kwargs)
+        model.load_state_dict(state_dict)
+        return model
+
+    def quantum(self, x):
+        if isinstance(self.qlayer, ShiftedVQALayer):
+            return self.qlayer(x)  # the simulator counts its own circuits
+        with profiler.stage("qnode.forward"):
+            if self.broadcast:
+                out = self.qlayer(x)  # (batch,) from one broadcast execution
+            else:
+                # Per-sample reference path of the original notebook
+                out = torch.stack([self.qlayer(x[i]).squeeze() for i in range(x.shape[0])])
+        profiler.count_circuits(x.shape[0])
+        return out
+
+    def forward(self, x):
+        # x: (batch_size, n_qubits) or (n_qubits,); returns logits of shape (batch_size,)
+        if x.ndim == 1:
+            x = x.unsqueeze(0)
+        if x.shape[1] != self.n_qubits:
+            raise ValueError(f"Expected {self.n_qubits} features, got {x.shape[1]}.")
+        if self.pre is not None:
+            with profiler.stage("classical.pre"):
+                x = self.pre(x)
+        qout = self.quantum(x).reshape(-1, 1).to(x.dtype)
+        with profiler.stage("classical.head"):
+            return self.head(qout).squeeze(1)
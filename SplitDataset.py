@@ -0,0 +1,241 @@
+import argparse
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+import pandas as pd
+import torch
+
+'''
+Single-file container for a dataset and its splits (.tds).
+
+    write_split_dataset("wdbc.tds", X, y, splits={"train": idx_train, "test": idx_test})
+    data = open_split_dataset("wdbc.tds")
+    X_train, y_train = data.split("train")     # torch tensors on the file, no copy
+
+Layout:
+    8 bytes   magic b"SPLITDS1"
+    8 bytes   header length, little-endian uint64
+    header    UTF-8 JSON: dtype/shape/offset of every array, the split ranges,
+              column names, label column and category levels
+    arrays    features (n_rows, n_features), labels, row_ids, each starting
+              on a 64-byte boundary, C order
+The writer orders the rows split by split, so every split is one contiguous
+slice [start, stop) of the arrays; row_ids keeps the row's position in the
+source. Opening the file maps it copy-on-write (np.memmap mode "c"):
+nothing is read until a value is touched, split() hands out torch.from_numpy
+views of the mapping, and writes to those tensors never reach the file.
+
+Unlike the torch.save pickles, opening a file runs no code from it, and the
+whole dataset is one file instead of one per split and per label.
+
+Converters: from_torch_splits (the models/wdbc wdbc_<split>.pt files) and
+from_dataframe (data_reader / data_cleaning output).
+    python -m SplitDataset torch models/wdbc/wdbc models/wdbc/wdbc.tds
+    python -m SplitDataset frame Datasets/breast+cancer+wisconsin+diagnostic/wdbc.data wdbc.tds \\
+        --label diagnosis --drop id --fractions train=0.6 val=0.1 test=0.3
+'''
+
+MAGIC = b"SPLITDS1"
+ALIGN = 64
+
+
+def _align(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+class SplitDataset:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, header_len = struct.unpack("<8sQ", f.read(16))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a split dataset file.")
+            header = json.loads(f.read(header_len).decode("utf-8"))
+        self.path = path
+        self.header = header
+        self.columns = header["columns"]
+        self.label_col = header["label_col"]
+        self.categories = header["categories"]
+        self.splits = {name: tuple(bounds) for name, bounds in header["splits"].items()}
+
+        raw = np.memmap(path, dtype=np.uint8, mode="c")
+        data_start = _align(16 + header_len)
+        self.arrays = {}
+        for name, spec in header["arrays"].items():
+            dtype = np.dtype(spec["dtype"])
+            start = data_start + spec["offset"]
+            count = int(np.prod(spec["shape"], dtype=np.int64))
+            self.arrays[name] = raw[start:start + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+        self.features = self.arrays["features"]
+        self.labels = self.arrays.get("labels")
+        self.row_ids = self.arrays["row_ids"]
+
+    def __len__(self):
+        return self.features.shape[0]
+
+    def __repr__(self):
+        splits = ", ".join(f"{name}={stop - start}" for name, (start, stop) in self.splits.items())
+        return f"SplitDataset({self.path!r}, rows={len(self)}, features={self.features.shape[1]}, {splits})"
+
+    def split_arrays(self, name):
+        '''(features, labels) of a split as numpy views of the file.'''
+        start, stop = self.splits[name]
+        labels = self.labels[start:stop] if self.labels is not None else None
+        return self.features[start:stop], labels
+
+    def split(self, name):
+        '''(features, labels) of a split as torch tensors sharing memory with the mapping.'''
+        X, y = self.split_arrays(name)
+        return torch.from_numpy(X), torch.from_numpy(y) if y is not None else None
+
+
+def open_split_dataset(path):
+    return SplitDataset(path)
+
+
+def write_split_dataset(path, features, labels=None, splits=None, columns=None, label_col=None, categories=None,
+                        source=None):
+    '''
+    Write features (n_rows, n_features), labels (n_rows, ...) and the splits
+    {name: row indices} to path. The splits must not overlap; rows in none of
+    them are kept after the last split. Without splits the file has one
+    split, "all". The file is written to a temp file and renamed into place.
+    '''
+    features = np.ascontiguousarray(np.asarray(features))
+    n = features.shape[0]
+    if labels is not None:
+        labels = np.asarray(labels)
+        if labels.shape[0] != n:
+            raise ValueError(f"features has {n} rows but labels has {labels.shape[0]}.")
+    if splits is None:
+        splits = {"all": np.arange(n)}
+
+    order, bounds, taken = [], {}, np.zeros(n, dtype=bool)
+    for name, idx in splits.items():
+        idx = np.asarray(idx, dtype=np.int64).reshape(-1)
+        if taken[idx].any() or len(np.unique(idx)) != len(idx):
+            raise ValueError(f"Split {name!r} overlaps an earlier split or repeats rows.")
+        taken[idx] = True
+        start = sum(len(o) for o in order)
+        bounds[name] = [start, start + len(idx)]
+        order.append(idx)
+    order.append(np.flatnonzero(~taken))
+    row_ids = np.concatenate(order)
+
+    arrays = {"features": features[row_ids], "row_ids": row_ids}
+    if labels is not None:
+        arrays["labels"] = np.ascontiguousarray(labels[row_ids])
+    specs, offset = {}, 0
+    for name, array in arrays.items():
+        specs[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = _align(offset + array.nbytes)
+    header = json.dumps({
+        "version": 1, "n_rows": n, "arrays": specs, "splits": bounds,
+        "columns": list(columns) if columns is not None else None,
+        "label_col": label_col, "categories": categories or {}, "source": source,
+    }).encode("utf-8")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".split-dataset-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(struct.pack("<8sQ", MAGIC, len(header)))
+            f.write(header)
+            data_start = _align(16 + len(header))
+            for name, array in arrays.items():
+                f.seek(data_start + specs[name]["offset"])
+                f.write(array.tobytes())
+            f.truncate(data_start + offset)
+        # mkstemp creates the file 0600; give it the usual permissions
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp, 0o666 & ~umask)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return path
+
+
+# ---Converters---
+def from_torch_splits(prefix, path, names=("train", "val", "test"), columns=None):
+    '''Pack the <prefix>_<split>.pt / <prefix>_<split>_label.pt tensors into one file.'''
+    features, labels, splits, start = [], [], {}, 0
+    for name in names:
+        X = torch.load(f"{prefix}_{name}.pt", weights_only=True).numpy()
+        y = torch.load(f"{prefix}_{name}_label.pt", weights_only=True).numpy()
+        features.append(X)
+        labels.append(y)
+        splits[name] = np.arange(start, start + len(X))
+        start += len(X)
+    return write_split_dataset(path, np.concatenate(features), np.concatenate(labels), splits, columns=columns,
+                               source=prefix)
+
+
+def from_dataframe(df, path, label_col, splits=None, fractions=None, seed=42, drop=(), dtype=np.float32):
+    '''
+    Write a data_reader / data_cleaning DataFrame. Text and categorical
+    columns (and the label, if it is not numeric) are stored as integer
+    codes, their levels go to the header. Splits are given as row indices,
+    or as fractions {"train": 0.8, "test": 0.2} of a seeded shuffle; if the
+    fractions sum to less than 1, the remaining rows are in no split.
+    '''
+    df = df.drop(columns=list(drop))
+    categories = {}
+
+    def encode(col):
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+            return values.to_numpy()
+        codes, levels = pd.factorize(values, sort=True)
+        categories[col] = [str(level) for level in levels]
+        return codes
+
+    feature_columns = [col for col in df.columns if col != label_col]
+    features = np.column_stack([encode(col) for col in feature_columns]).astype(dtype)
+    labels = encode(label_col).astype(dtype)
+
+    if splits is None and fractions is not None:
+        if sum(fractions.values()) > 1.0 + 1e-9:
+            raise ValueError(f"Split fractions sum to {sum(fractions.values())}, more than 1.")
+        order = np.random.default_rng(seed).permutation(len(df))
+        cuts = np.round(np.cumsum(list(fractions.values())) * len(df)).astype(int)
+        # Rows past the last cut belong to no split; write_split_dataset keeps them after it
+        splits = dict(zip(fractions, np.split(order, cuts)[:len(fractions)]))
+        splits = {name: np.sort(idx) for name, idx in splits.items()}
+    return write_split_dataset(path, features, labels, splits, columns=feature_columns, label_col=label_col,
+                               categories=categories)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert datasets to the split dataset format")
+    sub = parser.add_subparsers(dest="source", required=True)
+    pt = sub.add_parser("torch", help="<prefix>_<split>.pt and <prefix>_<split>_label.pt files")
+    pt.add_argument("prefix")
+    pt.add_argument("out")
+    pt.add_argument("--splits", nargs="+", default=["train", "val", "test"])
+    frame = sub.add_parser("frame", help="a file data_reader can read")
+    frame.add_argument("input")
+    frame.add_argument("out")
+    frame.add_argument("--label", required=True)
+    frame.add_argument("--drop", nargs="*", default=[])
+    frame.add_argument("--fractions", nargs="*", default=[], help="name=fraction, e.g. train=0.8 test=0.2")
+    frame.add_argument("--seed", type=int, default=42)
+    frame.add_argument("--clean", action="store_true", help="run data_cleaning first")
+    args = parser.parse_args()
+
+    if args.source == "torch":
+        out = from_torch_splits(args.prefix, args.out, args.splits)
+    else:
+        from DataFilesNormalization import data_cleaning, data_reader
+
+        df = data_reader(args.input)
+        if args.clean:
+            df = data_cleaning(df)
+        fractions = {name: float(value) for name, value in (item.split("=") for item in args.fractions)} or None
+        out = from_dataframe(df, args.out, args.label, fractions=fractions, seed=args.seed, drop=args.drop)
+    print(open_split_dataset(out))
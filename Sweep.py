@@ -0,0 +1,328 @@
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import torch
+import torch.nn as nn
+
+from Preprocessing import PreprocessingPipeline
+from SplitDataset import open_split_dataset, write_split_dataset
+from Trainer import Trainer
+
+'''
+Cross-validated hyperparameter sweep over n_qubits, n_layers, PCA dimension
+and learning rate.
+
+    sweep = Sweep("sweeps/dia", {"n_qubits": [2, 4, 5], "n_layers": [1, 2, 4],
+                                 "pca": [3, 5, 8], "lr": [0.01, 0.05]})
+    sweep.run(X, y)
+    sweep.summary()        # DataFrame, best configuration first
+
+- Every configuration is scored by stratified k-fold CV (mean validation
+  AUC). The model is QuantumLayers.HybridModel on the numpy simulator, whose
+  classical input layer maps any PCA dimension onto n_qubits.
+- The scaler + PCA is fitted once per (PCA dimension, fold) on the training
+  rows of the fold and written to workdir/data as a SplitDataset file
+  (train and val splits). Workers only receive the path and memory-map it,
+  so all configurations and processes share one copy of the data.
+- Successive halving: every configuration trains min_epochs, the best
+  1/eta by mean AUC continue to eta times the epochs, and so on for the
+  given number of rungs. Training continues from the Trainer checkpoint of the previous
+  rung instead of starting over.
+- Every finished (configuration, fold, rung) is appended to
+  workdir/results.jsonl as soon as it completes. Running the same sweep
+  again skips what is recorded there and resumes unfinished folds from
+  their checkpoints; promotions are recomputed from the file, so a resumed
+  sweep makes the same decisions as an uninterrupted one.
+
+search="random" samples trials configurations instead of the full grid; a
+(low, high) tuple in the space is then drawn log-uniformly, and rounded to
+an integer when both bounds are integers (n_qubits, n_layers, pca).
+
+The pool uses "spawn", so scripts need an if __name__ == "__main__" guard.
+    python -m Sweep --workdir sweeps/dia --n-qubits 2 4 5 --n-layers 1 2 --pca 3 5 --lr 0.01 0.05
+'''
+
+DEFAULT_SPACE = {"n_qubits": [2, 3, 4, 5], "n_layers": [1, 2, 4], "pca": [3, 5, 8], "lr": [0.01, 0.05]}
+
+
+def config_id(config):
+    return hashlib.sha1(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:10]
+
+
+def grid_configs(space):
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+
+
+def random_configs(space, trials, seed):
+    rng = np.random.default_rng(seed)
+    configs, seen = [], set()
+    for _ in range(trials * 20):
+        config = {}
+        for key, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                value = float(np.exp(rng.uniform(np.log(low), np.log(high))))
+                if isinstance(low, (int, np.integer)) and isinstance(high, (int, np.integer)):
+                    value = int(min(max(round(value), low), high))
+                config[key] = value
+            else:
+                value = values[rng.integers(len(values))]
+                config[key] = value.item() if isinstance(value, np.generic) else value
+        if config_id(config) not in seen:
+            seen.add(config_id(config))
+            configs.append(config)
+        if len(configs) == trials:
+            break
+    return configs
+
+
+# ---Worker---
+def _init_worker(n_threads):
+    if n_threads is not None:
+        torch.set_num_threads(n_threads)
+
+
+def _train_fold(config, fold, data_path, checkpoint, epochs, batch_size, seed):
+    from sklearn.metrics import roc_auc_score
+
+    from QuantumLayers import HybridModel
+
+    data = open_split_dataset(data_path)
+    X_train, y_train = data.split("train")
+    X_val, y_val = data.split("val")
+
+    torch.manual_seed(seed + fold)
+    model = HybridModel(X_train.shape[1], config["n_qubits"], config["n_layers"], backend="numpy")
+    trainer = Trainer(model, torch.optim.Adam(model.parameters(), lr=config["lr"]), nn.BCELoss(),
+                      batch_size=batch_size, epochs=epochs, checkpoint=checkpoint, seed=seed + fold)
+    start = time.perf_counter()
+    trainer.fit(X_train, y_train)
+    seconds = time.perf_counter() - start
+
+    logs = trainer.evaluate(X_val, y_val)
+    model.eval()
+    with torch.no_grad():
+        probs = model(X_val).numpy().ravel()
+    labels = y_val.numpy().ravel()
+    return {
+        "val_auc": float(roc_auc_score(labels, probs)),
+        "val_loss": logs["val_loss"],
+        "val_accuracy": float(((probs >= 0.5) == labels).mean()),
+        "seconds": seconds,
+    }
+
+
+# ---Sweep---
+class Sweep:
+    def __init__(self, workdir: str, space: dict = None, search: str = "grid", trials: int = 20, folds: int = 5,
+                 min_epochs: int = 1, eta: int = 3, rungs: int = 3, batch_size: int = 16, seed: int = 42,
+                 n_workers: int = None):
+        if search not in ("grid", "random"):
+            raise ValueError(f"Unknown search {search!r}; use 'grid' or 'random'.")
+        if eta < 2:
+            raise ValueError("eta must be at least 2.")
+        self.workdir = workdir
+        self.space = space or DEFAULT_SPACE
+        self.search = search
+        self.trials = trials
+        self.folds = folds
+        self.min_epochs = min_epochs
+        self.eta = eta
+        self.rungs = rungs
+        self.batch_size = batch_size
+        self.seed = seed
+        # 0 runs in-process
+        self.n_workers = (os.cpu_count() or 1) if n_workers is None else n_workers
+        self.configs = grid_configs(self.space) if search == "grid" else random_configs(self.space, trials, seed)
+        self.results_path = os.path.join(workdir, "results.jsonl")
+
+    # ---State on disk---
+    def _settings(self):
+        return {
+            "space": {key: list(values) for key, values in self.space.items()}, "search": self.search,
+            "trials": self.trials, "folds": self.folds, "min_epochs": self.min_epochs, "eta": self.eta,
+            "rungs": self.rungs, "batch_size": self.batch_size, "seed": self.seed,
+        }
+
+    def _check_settings(self, data_key):
+        settings = dict(self._settings(), data=data_key)
+        path = os.path.join(self.workdir, "sweep.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved != settings:
+                raise ValueError(f"{self.workdir} holds a different sweep; use another workdir to start a new one.")
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(settings, f, indent=1)
+
+    def results(self):
+        '''Every recorded (configuration, fold, rung) result, in completion order.'''
+        if not os.path.exists(self.results_path):
+            return []
+        with open(self.results_path, encoding="utf-8") as f:
+            # A line cut short by an interruption is skipped and its fold rerun
+            records = []
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+            return records
+
+    def _repair(self):
+        # Cut a last line left unfinished by an interruption, so the next record starts on its own line
+        if not os.path.exists(self.results_path):
+            return
+        with open(self.results_path, "rb+") as f:
+            content = f.read()
+            if content and not content.endswith(b"\n"):
+                f.truncate(content.rfind(b"\n") + 1)
+
+    def _append(self, record):
+        with open(self.results_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    # ---Data---
+    def _prepare_data(self, X, y):
+        '''One SplitDataset file per (PCA dimension, fold), fitted on the training rows of the fold.'''
+        from sklearn.model_selection import StratifiedKFold
+
+        data_dir = os.path.join(self.workdir, "data")
+        os.makedirs(data_dir, exist_ok=True)
+        folds = list(StratifiedKFold(self.folds, shuffle=True, random_state=self.seed).split(X, y))
+        paths = {}
+        for pca in sorted({config["pca"] for config in self.configs}):
+            for fold, (train_idx, val_idx) in enumerate(folds):
+                path = os.path.join(data_dir, f"pca{pca}-fold{fold}.tds")
+                if not os.path.exists(path):
+                    preprocessing = PreprocessingPipeline.fit(X[train_idx], n_components=pca, seed=self.seed)
+                    write_split_dataset(path, preprocessing.transform(X).astype(np.float32), y.reshape(-1, 1),
+                                        splits={"train": train_idx, "val": val_idx})
+                paths[pca, fold] = path
+        return paths
+
+    def epochs(self, rung):
+        return self.min_epochs * self.eta ** rung
+
+    def _promote(self, rung, live, done):
+        '''The best 1/eta of the live configurations by mean fold AUC at this rung.'''
+        scores = [(np.mean([done[cid, fold, rung]["val_auc"] for fold in range(self.folds)]), i, cid)
+                  for i, cid in enumerate(live)]
+        keep = max(1, math.ceil(len(live) / self.eta))
+        return [cid for _, _, cid in sorted(scores, key=lambda s: (-s[0], s[1]))[:keep]]
+
+    # ---Running---
+    def run(self, X, y, verbose: bool = True):
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float32).reshape(-1)
+        os.makedirs(self.workdir, exist_ok=True)
+        self._check_settings(hashlib.sha1(X.tobytes() + y.tobytes()).hexdigest()[:16])
+        paths = self._prepare_data(X, y)
+        self._repair()
+
+        by_id = {config_id(config): config for config in self.configs}
+        done = {(r["config_id"], r["fold"], r["rung"]): r for r in self.results()}
+        live = list(by_id)
+        pool = None
+        if self.n_workers > 0:
+            # Workers get one thread each so N folds use N cores without oversubscription
+            pool = ProcessPoolExecutor(self.n_workers, mp_context=mp.get_context("spawn"),
+                                       initializer=_init_worker, initargs=(1,))
+        try:
+            for rung in range(self.rungs):
+                epochs = self.epochs(rung)
+                tasks = [(cid, fold) for cid in live for fold in range(self.folds) if (cid, fold, rung) not in done]
+                if verbose:
+                    print(f"rung {rung}: {len(live)} configurations x {self.folds} folds, {epochs} epochs, "
+                          f"{len(tasks)} to run", flush=True)
+                for cid, fold, result in self._map(pool, tasks, by_id, paths, epochs):
+                    record = {"config_id": cid, "config": by_id[cid], "fold": fold, "rung": rung, "epochs": epochs,
+                              **result}
+                    self._append(record)
+                    done[cid, fold, rung] = record
+                if rung < self.rungs - 1:
+                    live = self._promote(rung, live, done)
+        finally:
+            if pool is not None:
+                # Queued folds of a failed or interrupted rung are dropped, not trained for nothing
+                pool.shutdown(cancel_futures=True)
+        return self.summary()
+
+    def _map(self, pool, tasks, by_id, paths, epochs):
+        def args(cid, fold):
+            checkpoint = os.path.join(self.workdir, "checkpoints", f"{cid}-fold{fold}.pt")
+            return (by_id[cid], fold, paths[by_id[cid]["pca"], fold], checkpoint, epochs, self.batch_size, self.seed)
+
+        if pool is None:
+            for cid, fold in tasks:
+                yield cid, fold, _train_fold(*args(cid, fold))
+            return
+        futures = {pool.submit(_train_fold, *args(cid, fold)): (cid, fold) for cid, fold in tasks}
+        for future in as_completed(futures):
+            cid, fold = futures[future]
+            yield cid, fold, future.result()
+
+    def summary(self):
+        '''One row per configuration at the highest rung it reached, best mean AUC first.'''
+        records = self.results()
+        if not records:
+            return pd.DataFrame()
+        df = pd.DataFrame([{**r["config"], **{k: v for k, v in r.items() if k != "config"}} for r in records])
+        df = df[df["rung"] == df.groupby("config_id")["rung"].transform("max")]
+        keys = list(self.space)
+        summary = df.groupby(["config_id", *keys, "rung", "epochs"], as_index=False).agg(
+            folds=("fold", "count"), val_auc=("val_auc", "mean"), val_auc_std=("val_auc", "std"),
+            val_loss=("val_loss", "mean"), val_accuracy=("val_accuracy", "mean"), seconds=("seconds", "sum"),
+        )
+        return summary.sort_values(["rung", "val_auc"], ascending=False, ignore_index=True)
+
+
+def load_dia_features(groups=None):
+    '''DIA training set as (X, y); groups selects descriptor groups (see DIAHelper.ColumnCatalog).'''
+    from DIAHelper import Helper
+
+    helper = Helper("Datasets/drug+induced+autoimmunity+prediction/DIA_trainingset_RDKit_descriptors.csv",
+                    "Datasets/drug+induced+autoimmunity+prediction/DIA_testset_RDKit_descriptors.csv")
+    return helper.select(groups=groups), helper.select(cols=["Label"]).ravel()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-validated n_qubits / n_layers / PCA / lr sweep on DIA")
+    parser.add_argument("--workdir", default="sweeps/dia")
+    parser.add_argument("--n-qubits", type=int, nargs="+", default=DEFAULT_SPACE["n_qubits"])
+    parser.add_argument("--n-layers", type=int, nargs="+", default=DEFAULT_SPACE["n_layers"])
+    parser.add_argument("--pca", type=int, nargs="+", default=DEFAULT_SPACE["pca"])
+    parser.add_argument("--lr", type=float, nargs="+", default=DEFAULT_SPACE["lr"],
+                        help="values for grid search; two values are a log-uniform range for random search")
+    parser.add_argument("--search", choices=["grid", "random"], default="grid")
+    parser.add_argument("--trials", type=int, default=20, help="configurations for random search")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--min-epochs", type=int, default=1)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--rungs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default: all cores, 0: in-process)")
+    parser.add_argument("--groups", nargs="*", default=None, help='descriptor groups or globs, e.g. "fr_*" "Chi*"')
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    lr = tuple(args.lr) if args.search == "random" and len(args.lr) == 2 else args.lr
+    space = {"n_qubits": args.n_qubits, "n_layers": args.n_layers, "pca": args.pca, "lr": lr}
+    X, y = load_dia_features(args.groups)
+    sweep = Sweep(args.workdir, space, args.search, args.trials, args.folds, args.min_epochs, args.eta, args.rungs,
+                  args.batch_size, args.seed, args.workers)
+    pd.set_option("display.width", 200)
+    print(sweep.run(X, y).to_string(index=False))
@@ -0,0 +1,257 @@
+import copy
+import os
+import queue
+import tempfile
+import threading
+
+import numpy as np
+import torch
+
+from Profiler import profiler
+
+'''
+Mini-batch training harness shared by the notebooks, TrainingJob and the
+ensemble members.
+
+    trainer = Trainer(model, optimizer, nn.BCELoss(), batch_size=16, epochs=50,
+                      patience=5, checkpoint="run.pt")
+    history = trainer.fit(X_train, y_train, X_val, y_val)
+
+- PrefetchLoader shuffles the rows every epoch and builds the next batches
+  (contiguous copies of the selected rows) in a background thread, so the
+  gather overlaps with the quantum forward/backward of the current batch.
+  The order of epoch e depends only on (seed, e), which keeps a resumed run
+  on the same batches as an uninterrupted one.
+- EarlyStopping watches val_loss (the training loss without validation data)
+  and stops after patience epochs without an improvement of min_delta; the
+  best weights are restored at the end.
+- With checkpoint=path the model, optimizer, history and early-stopping state
+  are written after every epoch by save_checkpoint (temp file, fsync,
+  os.replace), so an interruption leaves either the previous or the new
+  checkpoint, never a truncated one. fit() resumes from it if it exists.
+  Runs resume at epoch boundaries; a partly trained epoch is repeated.
+'''
+
+
+# ---Batches---
+_END = object()
+
+
+class PrefetchLoader:
+    def __init__(self, X, y, batch_size: int = 16, shuffle: bool = True, seed: int = 0, prefetch: int = 2):
+        self.X = torch.as_tensor(np.asarray(X, dtype=np.float32))
+        self.y = torch.as_tensor(np.asarray(y, dtype=np.float32))
+        if self.X.shape[0] != self.y.shape[0]:
+            raise ValueError(f"X has {self.X.shape[0]} rows but y has {self.y.shape[0]}.")
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.prefetch = prefetch
+        self._epoch = 0
+
+    def __len__(self):
+        return -(-self.X.shape[0] // self.batch_size)
+
+    def __iter__(self):
+        self._epoch += 1
+        return self.epoch(self._epoch - 1)
+
+    def order(self, epoch: int):
+        n = self.X.shape[0]
+        if not self.shuffle:
+            return torch.arange(n)
+        return torch.from_numpy(np.random.default_rng([self.seed, epoch]).permutation(n))
+
+    def epoch(self, epoch: int):
+        '''Batches (X, y) of the given epoch, prepared prefetch batches ahead.'''
+        order = self.order(epoch)
+        batches = torch.split(order, self.batch_size)
+        if self.prefetch <= 0:
+            for idx in batches:
+                yield self.X.index_select(0, idx), self.y.index_select(0, idx)
+            return
+
+        ready = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    ready.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for idx in batches:
+                    if not put((self.X.index_select(0, idx), self.y.index_select(0, idx))):
+                        return
+                put(_END)
+            except BaseException as e:
+                put(e)
+
+        worker = threading.Thread(target=produce, daemon=True)
+        worker.start()
+        try:
+            while True:
+                with profiler.stage("loader.wait"):
+                    item = ready.get()
+                if item is _END:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # Also runs when the consumer breaks out early
+            stop.set()
+            worker.join()
+
+
+# ---Early stopping---
+class EarlyStopping:
+    def __init__(self, patience: int = 5, min_delta: float = 0.0):
+        self.patience = patience
+        self.min_delta = min_delta
+        self.best = float("inf")
+        self.bad_epochs = 0
+
+    def step(self, value: float) -> bool:
+        '''Record one epoch; True if value is a new best.'''
+        if value < self.best - self.min_delta:
+            self.best = value
+            self.bad_epochs = 0
+            return True
+        self.bad_epochs += 1
+        return False
+
+    @property
+    def should_stop(self):
+        return self.bad_epochs >= self.patience
+
+    def state_dict(self):
+        return {"best": self.best, "bad_epochs": self.bad_epochs}
+
+    def load_state_dict(self, state):
+        self.best = state["best"]
+        self.bad_epochs = state["bad_epochs"]
+
+
+# ---Checkpoints---
+def save_checkpoint(path, state: dict):
+    '''torch.save state to path atomically: a crash leaves the old file or the new one.'''
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".checkpoint-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            torch.save(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return path
+
+
+def load_checkpoint(path):
+    return torch.load(path, map_location="cpu", weights_only=True)
+
+
+# ---Training---
+class Trainer:
+    def __init__(self, model, optimizer, loss_fn, batch_size: int = 16, epochs: int = 50, patience: int = None,
+                 min_delta: float = 0.0, checkpoint: str = None, seed: int = 42, prefetch: int = 2, metrics: dict = None):
+        self.model = model
+        self.optimizer = optimizer
+        self.loss_fn = loss_fn
+        self.batch_size = batch_size
+        self.epochs = epochs
+        self.early_stopping = EarlyStopping(patience, min_delta) if patience is not None else None
+        self.checkpoint = checkpoint
+        self.seed = seed
+        self.prefetch = prefetch
+        # name -> fn(predictions, targets) -> float, evaluated on the validation set
+        self.metrics = metrics or {}
+        self.history = []
+        self.best_state = None
+        self.stopped = False
+
+    def state_dict(self):
+        return {
+            "model": self.model.state_dict(),
+            "optimizer": self.optimizer.state_dict(),
+            "history": self.history,
+            "early_stopping": self.early_stopping.state_dict() if self.early_stopping else None,
+            "best_state": self.best_state,
+            "rng": torch.get_rng_state(),
+        }
+
+    def load_state_dict(self, state):
+        self.model.load_state_dict(state["model"])
+        self.optimizer.load_state_dict(state["optimizer"])
+        self.history = list(state["history"])
+        if self.early_stopping and state["early_stopping"]:
+            self.early_stopping.load_state_dict(state["early_stopping"])
+        self.best_state = state["best_state"]
+        torch.set_rng_state(state["rng"])
+
+    def evaluate(self, X, y):
+        X = torch.as_tensor(np.asarray(X, dtype=np.float32))
+        y = torch.as_tensor(np.asarray(y, dtype=np.float32))
+        was_training = self.model.training
+        self.model.eval()
+        with torch.no_grad():
+            preds = self.model(X)
+            logs = {"val_loss": self.loss_fn(preds, y).item()}
+            logs.update({name: float(fn(preds, y)) for name, fn in self.metrics.items()})
+        self.model.train(was_training)
+        return logs
+
+    def fit(self, X, y, X_val=None, y_val=None, on_epoch=None, stop: threading.Event = None):
+        '''
+        Train up to self.epochs, resuming from self.checkpoint if it exists.
+        on_epoch(logs) is called after every epoch; setting stop ends the run
+        after the current batch. Returns the history, one logs dict per epoch.
+        '''
+        loader = PrefetchLoader(X, y, self.batch_size, shuffle=True, seed=self.seed, prefetch=self.prefetch)
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            self.load_state_dict(load_checkpoint(self.checkpoint))
+        # A run resumed after it stopped early trains no further, but still gets its best weights back
+        first = self.epochs if self.early_stopping and self.early_stopping.should_stop else len(self.history)
+        n = loader.X.shape[0]
+        for epoch in range(first, self.epochs):
+            self.model.train()
+            total = 0.0
+            for Xb, yb in loader.epoch(epoch):
+                if stop is not None and stop.is_set():
+                    self.stopped = True
+                    return self.history
+                self.optimizer.zero_grad()
+                loss = self.loss_fn(self.model(Xb), yb)
+                with profiler.stage("backward"):
+                    loss.backward()
+                with profiler.stage("optimizer.step"):
+                    self.optimizer.step()
+                total += loss.item() * len(Xb)
+            profiler.next_epoch()
+
+            logs = {"epoch": epoch + 1, "loss": total / n}
+            if X_val is not None:
+                logs.update(self.evaluate(X_val, y_val))
+            self.history.append(logs)
+            if self.early_stopping and self.early_stopping.step(logs.get("val_loss", logs["loss"])):
+                self.best_state = copy.deepcopy(self.model.state_dict())
+            if self.checkpoint:
+                save_checkpoint(self.checkpoint, self.state_dict())
+            if on_epoch is not None:
+                on_epoch(logs)
+            if self.early_stopping and self.early_stopping.should_stop:
+                break
+
+        if self.best_state is not None:
+            self.model.load_state_dict(self.best_state)
+        return self.history
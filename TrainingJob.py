@@ -0,0 +1,106 @@
+import threading
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from Profiler import profiler
+from Trainer import Trainer
+
+'''
+Background training for app.py.
+
+A Streamlit script reruns on every widget change, so training cannot run
+inside it. TrainingJob trains a HybridQNN in a daemon thread and exposes its
+progress through status(); the page keeps the job in st.session_state and
+polls it, so each rerun only reads a snapshot and never waits on training.
+The loop itself is Trainer.fit (prefetched shuffled mini-batches).
+
+    job = TrainingJob(X_train, y_train, X_test, y_test, n_qubits=6, n_layers=3)
+    job.start()
+    job.status()   # {"state": "running", "epoch": 2, "epochs": 10, "loss": [...], ...}
+    job.stop()     # stops after the current batch
+'''
+
+
+class TrainingJob:
+    def __init__(self, X_train, y_train, X_test, y_test, n_qubits: int = 5, n_layers: int = 4,
+                 epochs: int = 10, batch_size: int = 32, lr: float = 1e-2, seed: int = 42, device: str = "numpy"):
+        self.data = (X_train, y_train, X_test, y_test)
+        self.n_qubits = n_qubits
+        self.n_layers = n_layers
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.lr = lr
+        self.seed = seed
+        self.device = device
+        self.model = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._status = {"state": "idle", "epoch": 0, "epochs": epochs, "loss": [], "test_accuracy": None,
+                        "error": None, "elapsed": 0.0}
+
+    def _update(self, **changes):
+        with self._lock:
+            self._status.update(changes)
+
+    def status(self):
+        # A copy, so the page can render it while the worker keeps updating
+        with self._lock:
+            return dict(self._status, loss=list(self._status["loss"]))
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            raise RuntimeError("Training is already running.")
+        self._stop.clear()
+        self._update(state="running", epoch=0, loss=[], test_accuracy=None, error=None, elapsed=0.0)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            self._train(start)
+        except Exception as e:
+            self._update(state="failed", error=f"{type(e).__name__}: {e}", elapsed=time.perf_counter() - start)
+
+    def _train(self, start):
+        from QuantumLayers import HybridQNN
+
+        with profiler.stage("to_tensor"):
+            X_train, y_train, X_test, y_test = (torch.tensor(np.asarray(a, dtype=np.float32)) for a in self.data)
+        torch.manual_seed(self.seed)
+        model = HybridQNN(self.n_qubits, self.n_layers, device=self.device)
+        trainer = Trainer(model, torch.optim.Adam(model.parameters(), lr=self.lr), nn.BCEWithLogitsLoss(),
+                          batch_size=self.batch_size, epochs=self.epochs, seed=self.seed)
+
+        def on_epoch(logs):
+            with self._lock:
+                self._status["loss"].append(logs["loss"])
+                self._status.update(epoch=logs["epoch"], elapsed=time.perf_counter() - start)
+
+        trainer.fit(X_train, y_train, on_epoch=on_epoch, stop=self._stop)
+        if trainer.stopped:
+            self.model = model
+            self._update(state="stopped", elapsed=time.perf_counter() - start)
+            return
+
+        model.eval()
+        with torch.no_grad():
+            accuracy = ((model(X_test) > 0).float() == y_test).float().mean().item()
+        self.model = model
+        self._update(state="done", test_accuracy=accuracy, elapsed=time.perf_counter() - start)
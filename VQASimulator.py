@@ -0,0 +1,388 @@
+import numpy as np
+
+from Profiler import profiler
+
+'''
+Batched NumPy statevector simulator for the variational ansatz used by the
+hybrid models:
+
+    RY(x_i + shift_i) on every wire            (angle embedding)
+    n_layers x [ Rot(phi, theta, omega) on every wire, CNOT ring ]
+    <Z> on wire 0
+
+The whole batch is held as one (batch, 2**n_qubits) complex array, so a
+forward pass over B samples is a handful of vectorized array updates instead
+of B circuit builds and B estimator jobs.
+
+Gradients come in two flavours, both returning per-sample derivatives with
+respect to the inputs and to every weight:
+    parameter_shift - all +-pi/2 shifted inputs and weights are stacked into
+                      one array and evaluated in a single batched run
+    adjoint         - one forward pass plus one backward sweep over the gates,
+                      so the cost is about that of two forward passes
+
+ShotSampler replaces the exact <Z_0> with finite-shot estimates drawn from
+the same statevectors, for budgeting hardware-like execution.
+
+Wire ordering follows PennyLane: wire 0 is the most significant bit of the
+basis-state index.
+'''
+
+
+class StatevectorSimulator:
+    def __init__(self, n_qubits: int, n_layers: int):
+        if n_qubits < 1:
+            raise ValueError("n_qubits must be at least 1.")
+        if n_layers < 0:
+            raise ValueError("n_layers must be non-negative.")
+        self.n_qubits = n_qubits
+        self.n_layers = n_layers
+        self.dim = 2 ** n_qubits
+        self.weight_shape = (n_layers, n_qubits, 3)
+        # The CNOT ring only permutes basis states; it is fused into one index
+        # permutation here so every layer applies it with a single gather
+        self._ring, self._ring_inverse = ring_permutation(n_qubits)
+        # Circuits evaluated so far, one per batch row (benchmarks read and reset it)
+        self.executions = 0
+
+    # ---State handling---
+    def init_state(self, batch_size: int):
+        state = np.zeros((batch_size, self.dim), dtype=np.complex128)
+        state[:, 0] = 1.0
+        return state
+
+    def _split(self, state, wire: int):
+        # View the state as (batch, left, 2, right) so that axis 2 is the wire
+        left = 2 ** wire
+        right = 2 ** (self.n_qubits - wire - 1)
+        return state.reshape(state.shape[0], left, 2, right)
+
+    # ---Gates---
+    def apply_matrix(self, state, wire: int, matrix):
+        '''
+        Apply a single-qubit gate to every sample of the batch.
+        matrix is either (2, 2), shared by the batch, or (batch, 2, 2).
+        '''
+        matrix = np.asarray(matrix)
+        view = self._split(state, wire)
+        a0 = view[:, :, 0, :]
+        a1 = view[:, :, 1, :]
+        if matrix.ndim == 2:
+            m00, m01, m10, m11 = matrix[0, 0], matrix[0, 1], matrix[1, 0], matrix[1, 1]
+        else:
+            m00 = matrix[:, 0, 0, None, None]
+            m01 = matrix[:, 0, 1, None, None]
+            m10 = matrix[:, 1, 0, None, None]
+            m11 = matrix[:, 1, 1, None, None]
+        out = np.empty_like(view)
+        out[:, :, 0, :] = m00 * a0 + m01 * a1
+        out[:, :, 1, :] = m10 * a0 + m11 * a1
+        return out.reshape(state.shape)
+
+    def apply_ry(self, state, wire: int, theta):
+        # theta is a scalar or a (batch,) vector of per-sample angles
+        return self.apply_matrix(state, wire, ry_matrix(theta))
+
+    def apply_rz(self, state, wire: int, theta):
+        return self.apply_matrix(state, wire, rz_matrix(theta))
+
+    def apply_rot(self, state, wire: int, phi, theta, omega):
+        return self.apply_matrix(state, wire, rot_matrix(phi, theta, omega))
+
+    def apply_cnot(self, state, control: int, target: int):
+        n = self.n_qubits
+        tensor = state.reshape((state.shape[0],) + (2,) * n).copy()
+        # Flip the target axis on the control=1 slice
+        idx = [slice(None)] * (n + 1)
+        idx[control + 1] = 1
+        sub = tensor[tuple(idx)]
+        target_axis = target + 1 if target < control else target
+        tensor[tuple(idx)] = np.flip(sub, axis=target_axis)
+        return tensor.reshape(state.shape)
+
+    def apply_cnot_ring(self, state):
+        if self.n_qubits < 2:
+            return state
+        return state[:, self._ring]
+
+    def undo_cnot_ring(self, state):
+        if self.n_qubits < 2:
+            return state
+        return state[:, self._ring_inverse]
+
+    # ---Measurement---
+    def expval_z(self, state, wire: int = 0):
+        probs = np.abs(self._split(state, wire)) ** 2
+        return probs[:, :, 0, :].sum(axis=(1, 2)) - probs[:, :, 1, :].sum(axis=(1, 2))
+
+    # ---Ansatz---
+    def embed(self, inputs, shift=None):
+        inputs = np.asarray(inputs, dtype=np.float64)
+        if inputs.ndim == 1:
+            inputs = inputs[None, :]
+        if inputs.shape[1] != self.n_qubits:
+            raise ValueError(f"Expected {self.n_qubits} features, got {inputs.shape[1]}.")
+        angles = inputs if shift is None else inputs + np.asarray(shift, dtype=np.float64)
+        state = self.init_state(inputs.shape[0])
+        for wire in range(self.n_qubits):
+            state = self.apply_ry(state, wire, angles[:, wire])
+        return state
+
+    def apply_layer(self, state, layer_weights):
+        # layer_weights is (n_qubits, 3), or (batch, n_qubits, 3) for per-sample weights
+        for wire in range(self.n_qubits):
+            phi, theta, omega = np.moveaxis(layer_weights[..., wire, :], -1, 0)
+            state = self.apply_rot(state, wire, phi, theta, omega)
+        return self.apply_cnot_ring(state)
+
+    def _weights(self, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        if weights.ndim == 4:
+            if weights.shape[1:] != self.weight_shape:
+                raise ValueError(f"Expected per-sample weights of shape (batch, {self.weight_shape}), got {weights.shape}.")
+            return weights
+        return weights.reshape(self.weight_shape)
+
+    def statevector(self, inputs, weights, shift=None):
+        weights = self._weights(weights)
+        state = self.embed(inputs, shift)
+        self.executions += state.shape[0]
+        profiler.count_circuits(state.shape[0])
+        for layer in range(self.n_layers):
+            state = self.apply_layer(state, weights[..., layer, :, :])
+        return state
+
+    def run(self, inputs, weights, shift=None):
+        '''
+        Evaluate <Z_0> for a (batch, n_qubits) input array in one call.
+        weights is either shared, (n_layers, n_qubits, 3), or per-sample,
+        (batch, n_layers, n_qubits, 3).
+        Returns a (batch,) float64 array.
+        '''
+        return self.expval_z(self.statevector(inputs, weights, shift))
+
+    # ---Gradients---
+    def parameter_shift(self, inputs, weights, shift=np.pi / 2):
+        '''
+        Parameter-shift gradients of <Z_0>, evaluated in one batched run.
+        Returns (input_grads, weight_grads) of shape (batch, n_qubits) and
+        (batch, n_layers * n_qubits * 3).
+        '''
+        inputs = np.atleast_2d(np.asarray(inputs, dtype=np.float64))
+        rows_in, rows_w = shifted_parameters(inputs, self._weights(weights), shift)
+        expvals = self.run(rows_in, rows_w)
+        return split_shifted_expvals(expvals, inputs.shape[0], self.n_qubits)
+
+    def adjoint(self, inputs, weights):
+        '''
+        Adjoint-method gradients of <Z_0>: one forward pass, then a single
+        backward sweep that un-applies every gate to both the state and the
+        adjoint state Z_0|psi>. For a gate exp(-i t G / 2) the derivative is
+        Im(<lambda|G|psi>) taken just after the gate.
+        Same return shapes as parameter_shift.
+        '''
+        inputs = np.atleast_2d(np.asarray(inputs, dtype=np.float64))
+        weights = np.asarray(weights, dtype=np.float64).reshape(self.weight_shape)
+        state = self.statevector(inputs, weights)
+        lam = self.apply_matrix(state, 0, PAULI_Z)
+
+        def derivative(generator, wire):
+            g_state = self.apply_matrix(state, wire, generator)
+            return np.einsum("bi,bi->b", lam.conj(), g_state).imag
+
+        weight_grads = np.empty((inputs.shape[0],) + self.weight_shape)
+        for layer in reversed(range(self.n_layers)):
+            state = self.undo_cnot_ring(state)
+            lam = self.undo_cnot_ring(lam)
+            for wire in reversed(range(self.n_qubits)):
+                phi, theta, omega = weights[layer, wire]
+                # Rot = RZ(omega) RY(theta) RZ(phi), undone right to left
+                for idx, angle, generator, undo in (
+                    (2, omega, PAULI_Z, rz_matrix(-omega)),
+                    (1, theta, PAULI_Y, ry_matrix(-theta)),
+                    (0, phi, PAULI_Z, rz_matrix(-phi)),
+                ):
+                    weight_grads[:, layer, wire, idx] = derivative(generator, wire)
+                    state = self.apply_matrix(state, wire, undo)
+                    lam = self.apply_matrix(lam, wire, undo)
+
+        input_grads = np.empty(inputs.shape)
+        for wire in reversed(range(self.n_qubits)):
+            input_grads[:, wire] = derivative(PAULI_Y, wire)
+            undo = ry_matrix(-inputs[:, wire])
+            state = self.apply_matrix(state, wire, undo)
+            lam = self.apply_matrix(lam, wire, undo)
+        return input_grads, weight_grads.reshape(inputs.shape[0], -1)
+
+    def gradients(self, inputs, weights, method: str = "adjoint"):
+        if method == "adjoint":
+            return self.adjoint(inputs, weights)
+        if method == "parameter-shift":
+            return self.parameter_shift(inputs, weights)
+        raise ValueError(f"Unknown gradient method: {method}")
+
+
+class ShotSampler:
+    '''
+    Finite-shot <Z_0> on top of a StatevectorSimulator. Measuring Z_0 with n
+    shots gives n_plus ~ Binomial(n, p0), p0 the probability of wire 0 in |0>,
+    so a whole batch of circuits, each with its own shot count, is sampled
+    with one rng.binomial call and estimated as (2 n_plus - n) / n.
+
+    parameter_shift spends shots * (rows of shifted_parameters) shots per
+    call. With adaptive=True that budget is split between the +-shift terms in
+    proportion to each term's estimated standard deviation sqrt(1 - <Z>^2)
+    (Neyman allocation, which minimises the summed variance of the gradient
+    components); the estimate is a running average over previous calls, and
+    every term gets at least min_shots. Terms near +-1 need few shots, terms
+    near 0 get the rest.
+
+    total_shots counts every shot drawn, forward and gradient.
+    '''
+    def __init__(self, simulator, shots: int = 1000, adaptive: bool = True, min_shots: int = 10,
+                 seed: int = None, smoothing: float = 0.9):
+        if shots < 1:
+            raise ValueError("shots must be at least 1.")
+        if min_shots < 1:
+            raise ValueError("min_shots must be at least 1; a term with no shots has no estimate.")
+        self.simulator = simulator
+        self.n_qubits = simulator.n_qubits
+        self.weight_shape = simulator.weight_shape
+        self.shots = shots
+        self.adaptive = adaptive
+        self.min_shots = min(min_shots, shots)
+        self.smoothing = smoothing
+        self.rng = np.random.default_rng(seed)
+        self.total_shots = 0
+        self._term_variance = None  # running 1 - <Z>^2 per +-shift term
+
+    def sample(self, inputs, weights, shots, shift=None):
+        '''Shot estimates of <Z_0>; shots is one count for every row or a (rows,) array.'''
+        state = self.simulator.statevector(inputs, weights, shift)
+        # Wire 0 is the most significant bit: the first half of the amplitudes has it in |0>
+        p_plus = np.clip((np.abs(state[:, :self.simulator.dim // 2]) ** 2).sum(axis=1), 0.0, 1.0)
+        shots = np.broadcast_to(np.asarray(shots, dtype=np.int64), p_plus.shape)
+        n_plus = self.rng.binomial(shots, p_plus)
+        n_shots = int(shots.sum())
+        self.total_shots += n_shots
+        profiler.count_shots(n_shots)
+        return (2 * n_plus - shots) / shots
+
+    def run(self, inputs, weights, shift=None):
+        return self.sample(inputs, weights, self.shots, shift)
+
+    def allocate(self, n_terms: int, batch: int):
+        '''Shots for every row of shifted_parameters, (n_terms * batch,) in row order.'''
+        if not self.adaptive or self._term_variance is None or self._term_variance.shape[0] != n_terms:
+            return np.full(n_terms * batch, self.shots, dtype=np.int64)
+        std = np.sqrt(self._term_variance) + 1e-3
+        spare = (self.shots - self.min_shots) * n_terms
+        per_term = self.min_shots + np.floor(spare * std / std.sum()).astype(np.int64)
+        return np.repeat(per_term, batch)
+
+    def parameter_shift(self, inputs, weights, shift=np.pi / 2):
+        '''Same returns as StatevectorSimulator.parameter_shift, from shot estimates.'''
+        inputs = np.atleast_2d(np.asarray(inputs, dtype=np.float64))
+        batch = inputs.shape[0]
+        rows_in, rows_w = shifted_parameters(inputs, self.simulator._weights(weights), shift)
+        n_terms = rows_in.shape[0] // batch
+        expvals = self.sample(rows_in, rows_w, self.allocate(n_terms, batch))
+
+        variance = (1.0 - expvals.reshape(n_terms, batch) ** 2).mean(axis=1)
+        if self._term_variance is None or self._term_variance.shape[0] != n_terms:
+            self._term_variance = variance
+        else:
+            self._term_variance = self.smoothing * self._term_variance + (1.0 - self.smoothing) * variance
+        return split_shifted_expvals(expvals, batch, self.n_qubits)
+
+    def gradients(self, inputs, weights, method: str = "parameter-shift"):
+        if method in ("parameter-shift", "best"):
+            return self.parameter_shift(inputs, weights)
+        raise ValueError(f"diff_method={method!r} needs the exact statevector; shot sampling supports parameter-shift.")
+
+
+PAULI_Y = np.array([[0, -1j], [1j, 0]])
+PAULI_Z = np.array([[1, 0], [0, -1]], dtype=np.complex128)
+
+
+def ring_permutation(n_qubits: int):
+    '''
+    Index permutations of the CNOT ring CNOT(0,1) ... CNOT(n-2,n-1) CNOT(n-1,0).
+    Returns (forward, inverse) with ring|psi> == psi[..., forward] and
+    psi == (ring|psi>)[..., inverse].
+    '''
+    index = np.arange(2 ** n_qubits)
+    if n_qubits < 2:
+        return index, index
+    mapped = index.copy()
+    ring = [(w, w + 1) for w in range(n_qubits - 1)] + [(n_qubits - 1, 0)]
+    for control, target in ring:
+        # Wire 0 is the most significant bit
+        control_bit = (mapped >> (n_qubits - 1 - control)) & 1
+        mapped = mapped ^ (control_bit << (n_qubits - 1 - target))
+    # Basis state b ends up at mapped[b]
+    return np.argsort(mapped), mapped
+
+
+def shifted_parameters(inputs, weights, shift=np.pi / 2):
+    '''
+    Stack every +-shift copy of the inputs and of the weights for a whole batch.
+    Rows are ordered [inputs +shift, inputs -shift, weights +shift,
+    weights -shift], each block being (n_params, batch) flattened.
+    Returns (inputs, per-sample weights) ready for StatevectorSimulator.run.
+    '''
+    batch, n_qubits = inputs.shape
+    weight_shape = weights.shape
+    n_weights = weights.size
+
+    eye_in = shift * np.eye(n_qubits)
+    eye_w = shift * np.eye(n_weights).reshape((n_weights,) + weight_shape)
+    signs = np.array([1.0, -1.0])
+
+    # Input shifts, weights unchanged: (2, n_qubits, batch, n_qubits)
+    in_rows = inputs[None, None, :, :] + signs[:, None, None, None] * eye_in[None, :, None, :]
+    in_weights = np.broadcast_to(weights, (2 * n_qubits * batch,) + weight_shape)
+    # Weight shifts, inputs unchanged: (2, n_weights, batch) + weight_shape
+    w_shifted = weights + signs.reshape((2, 1) + (1,) * len(weight_shape)) * eye_w[None]
+    w_rows = np.broadcast_to(w_shifted[:, :, None], (2, n_weights, batch) + weight_shape)
+    w_inputs = np.broadcast_to(inputs, (2 * n_weights, batch, n_qubits))
+
+    rows_in = np.concatenate([in_rows.reshape(-1, n_qubits), w_inputs.reshape(-1, n_qubits)])
+    rows_w = np.concatenate([in_weights, w_rows.reshape((2 * n_weights * batch,) + weight_shape)])
+    return rows_in, rows_w
+
+
+def split_shifted_expvals(expvals, batch: int, n_qubits: int):
+    '''Turn the expectation values of shifted_parameters rows into (input_grads, weight_grads).'''
+    n_in = 2 * n_qubits * batch
+    f_in = expvals[:n_in].reshape(2, n_qubits, batch)
+    f_w = expvals[n_in:].reshape(2, -1, batch)
+    input_grads = 0.5 * (f_in[0] - f_in[1]).T
+    weight_grads = 0.5 * (f_w[0] - f_w[1]).T
+    return input_grads, weight_grads
+
+
+def ry_matrix(theta):
+    theta = np.asarray(theta, dtype=np.float64)
+    c, s = np.cos(theta / 2), np.sin(theta / 2)
+    return np.stack([np.stack([c, -s], axis=-1), np.stack([s, c], axis=-1)], axis=-2)
+
+
+def rz_matrix(theta):
+    theta = np.asarray(theta, dtype=np.float64)
+    zero = np.zeros_like(theta, dtype=np.complex128)
+    return np.stack([
+        np.stack([np.exp(-0.5j * theta), zero], axis=-1),
+        np.stack([zero, np.exp(0.5j * theta)], axis=-1),
+    ], axis=-2)
+
+
+def rot_matrix(phi, theta, omega):
+    # Rot(phi, theta, omega) = RZ(omega) RY(theta) RZ(phi), as in PennyLane
+    # Scalar angles give a (2, 2) matrix, (batch,) angles a (batch, 2, 2) stack
+    phi, theta, omega = (np.asarray(a, dtype=np.float64) for a in (phi, theta, omega))
+    c, s = np.cos(theta / 2), np.sin(theta / 2)
+    return np.stack([
+        np.stack([np.exp(-0.5j * (phi + omega)) * c, -np.exp(0.5j * (phi - omega)) * s], axis=-1),
+        np.stack([np.exp(-0.5j * (phi - omega)) * s, np.exp(0.5j * (phi + omega)) * c], axis=-1),
+    ], axis=-2)
@@ -1,10 +1,51 @@
 import streamlit as st
 from DataFilesNormalization import data_reader,data_cleaning
+from DatasetCache import CACHE_DIR, cache_key, load_dataframe
+from DIAHelper import column_catalog
+from Preprocessing import PreprocessingPipeline
+from QuantumLayers import make_qnode
+from TrainingJob import TrainingJob
 import inspect
+import os
 import pandas as pd
-import pennylane as qml
 import numpy as np
 
+TRAIN_PATH = "Datasets/drug+induced+autoimmunity+prediction/DIA_trainingset_RDKit_descriptors.csv"
+TEST_PATH = "Datasets/drug+induced+autoimmunity+prediction/DIA_testset_RDKit_descriptors.csv"
+MAX_CIRCUITS = 8 # devices/QNodes kept across reruns, least recently used evicted first
+
+# ---Cached across reruns---
+# Every widget change reruns this script; everything expensive below is keyed
+# on its inputs and only computed once per distinct value
+@st.cache_data(show_spinner="Loading dataset...")
+def load_clean_dataset(path, key):
+    # key (path + mtime + size) makes an edited CSV a cache miss
+    df = load_dataframe(path)
+    return data_cleaning(df, data=path.rsplit("/", 1)[-1], report=True)
+
+@st.cache_resource(max_entries=MAX_CIRCUITS)
+def get_qnode(n_qubits, n_layers):
+    # Device + QNode, shared by all sessions
+    return make_qnode(n_qubits, n_layers)
+
+@st.cache_resource(max_entries=MAX_CIRCUITS)
+def get_preprocessing(train_key, columns, n_qubits):
+    X = load_clean_dataset(TRAIN_PATH, train_key)[0][list(columns)]
+    # Artifacts go to the (gitignored) dataset cache, not into the source tree
+    return PreprocessingPipeline.fit_or_load(X, list(columns), n_components=n_qubits,
+                                             artifact_dir=os.path.join(CACHE_DIR, "preprocessing"))
+
+@st.cache_data(max_entries=MAX_CIRCUITS)
+def random_params(n_layers, n_qubits, seed=42):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(high=2 * np.pi, size=(n_layers, n_qubits, 3)), rng.uniform(high=2 * np.pi, size=n_qubits)
+
+@st.cache_data(max_entries=MAX_CIRCUITS)
+def draw_circuit(n_qubits, n_layers):
+    import pennylane as qml
+    weights, shift = random_params(n_layers, n_qubits)
+    return qml.draw(get_qnode(n_qubits, n_layers))(np.zeros(n_qubits), weights, shift)
+
 st.title("Quantum & AI Edge Computing")
 st.write("This is a demo of a Variational Quantum Algorithm application.")
 
@@ -17,14 +58,16 @@ dataset_description = (
 # ---Show dataset title and description in a text area---
 st.text_area("Dataset Information", f"Title: {dataset_title}\n\nDescription: {dataset_description}", height=150)
 
+# Parsed once into the columnar cache, cleaned once per file version
+train_key, test_key = cache_key(TRAIN_PATH), cache_key(TEST_PATH)
+train_df, train_report = load_clean_dataset(TRAIN_PATH, train_key)
+test_df, test_report = load_clean_dataset(TEST_PATH, test_key)
+
 # Open a collapsible section to explore data -
 # Needs to be changed for the specific dataset
 with st.expander("Show and Explore Dataset (Training Data)"):
 
-    train_df = pd.read_csv("Datasets/drug+induced+autoimmunity+prediction/DIA_trainingset_RDKit_descriptors.csv")
-    test_df = pd.read_csv("Datasets/drug+induced+autoimmunity+prediction/DIA_testset_RDKit_descriptors.csv")
-    data_cleaning(train_df, data="DIA_trainingset_RDKit_descriptors.csv")
-    data_cleaning(test_df, data="DIA_testset_RDKit_descriptors.csv")
+    st.write("Rows dropped by cleaning (train / test):", train_report, test_report)
     st.write("Preview of the dataset:")
     st.dataframe(train_df.head())
 
@@ -44,16 +87,17 @@ with st.expander("Show and Explore Dataset (Training Data)"):
 st.header("Variational Quantum Classifier")
 
 # ---Selecting columns with higher correlation and setting constants---
-X, X_test = train_df.columns[113:], test_df.columns[113:]
-X, X_test = train_df[X], test_df[X_test]
+columns = tuple(column_catalog(tuple(train_df.columns)).select_names(["functional_groups"])) # fr_* counts, see DIAHelper.COLUMN_GROUPS
+X, X_test = train_df[list(columns)], test_df[list(columns)]
 
 n_train, n_test = X.shape[0], X_test.shape[0]
 
 n_qubits = st.number_input("Select the number of qubits", min_value=1, max_value=10, value=6) # "window_size" previously
 n_layers = st.number_input("Select the number of layers", min_value=1, max_value=10, value=3) 
 
-dev = qml.device("default.qubit", wires=n_qubits)
-rand_params = np.random.uniform(high=2 * np.pi, size=(n_layers,n_qubits))
+qnode = get_qnode(n_qubits, n_layers)
+dev = qnode.device
+rand_params = random_params(n_layers, n_qubits)
 
 '''
 # Define the quantum device, variational ansatz
@@ -62,18 +106,45 @@ You can copy and paste your code here or define it in a separate file and import
 
 
 # Show circuit code and allow user to edit it
-default_ansatz_code = inspect.getsource() # Insert the ansatz code here
+default_ansatz_code = inspect.getsource(make_qnode) # Insert the ansatz code here
 st.code(default_ansatz_code, language='python')
+st.text(draw_circuit(n_qubits, n_layers))
 ansatz_code = st.button(
     "Edit the variational ansatz code")
 
 if ansatz_code:
-    st.text_area(value = default_ansatz_code, height=300)
-    exec(ansatz_code)
-
-'''
-Insert a button to run the training code
-'''
+    st.text_area("Variational ansatz", value = default_ansatz_code, height=300)
+
+# ---Training---
+# Runs in a background thread; the fragment below polls it without rerunning the page
+epochs = st.number_input("Epochs", min_value=1, max_value=100, value=10)
+job = st.session_state.get("training_job")
+if st.button("Train", disabled=job is not None and job.running):
+    preprocessing = get_preprocessing(train_key, columns, n_qubits)
+    job = TrainingJob(
+        preprocessing.transform(X), train_df["Label"].to_numpy(),
+        preprocessing.transform(X_test), test_df["Label"].to_numpy(),
+        n_qubits=n_qubits, n_layers=n_layers, epochs=epochs,
+    ).start()
+    st.session_state["training_job"] = job
+
+@st.fragment(run_every=1.0)
+def training_progress():
+    job = st.session_state.get("training_job")
+    if job is None:
+        return
+    status = job.status()
+    st.progress(status["epoch"] / status["epochs"], text=f"{status['state']}: epoch {status['epoch']}/{status['epochs']} ({status['elapsed']:.1f}s)")
+    if status["loss"]:
+        st.line_chart(pd.DataFrame({"train loss": status["loss"]}))
+    if status["test_accuracy"] is not None:
+        st.write(f"Test accuracy: {status['test_accuracy']:.3f}")
+    if status["error"]:
+        st.error(status["error"])
+    if job.running and st.button("Stop training"):
+        job.stop()
+
+training_progress()
 
 '''
 Insert a button to test + testing code
@@ -85,4 +156,4 @@ Insert a button for performance metrics and evaluation
 
 '''
 Results visualization
-'''
\ No newline at end of file
+'''
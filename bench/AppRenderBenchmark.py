@@ -0,0 +1,51 @@
+import argparse
+import os
+import time
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+'''
+Page-render latency of the Streamlit demo (app.py).
+
+Renders the page once (cold) and then reruns it the way widget changes do,
+cycling n_qubits through a few values so keyed caches see both hits and new
+keys. Each rerun is timed end to end in the same process, so
+st.cache_data / st.cache_resource stay warm between reruns, as they do on a
+real server.
+
+Run from the repository root:
+    python -m bench.AppRenderBenchmark --reruns 20
+    python -m bench.AppRenderBenchmark --app old_app.py    # e.g. a copy of an earlier app.py
+'''
+
+
+def run(app, reruns, qubits, timeout):
+    at = AppTest.from_file(os.path.abspath(app), default_timeout=timeout)
+    start = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - start
+    if at.exception:
+        print(f"first render raised: {at.exception[0].message}")
+
+    times = []
+    for i in range(reruns):
+        widget = at.number_input[0]
+        widget.set_value(qubits[i % len(qubits)])
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+
+    times = np.array(times) * 1e3
+    print(f"{app}: cold {cold * 1e3:.1f} ms")
+    print(f"reruns={reruns}  p50={np.percentile(times, 50):.1f} ms  p99={np.percentile(times, 99):.1f} ms  max={times.max():.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="app.py render latency")
+    parser.add_argument("--app", default="app.py")
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--qubits", type=int, nargs="+", default=[6, 5, 4], help="n_qubits values cycled between reruns")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+    run(args.app, args.reruns, args.qubits, args.timeout)
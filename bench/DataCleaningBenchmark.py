@@ -0,0 +1,61 @@
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from DataFilesNormalization import data_cleaning, data_reader
+
+'''
+Time and peak memory of data_cleaning against the previous four-pass
+version (drop_duplicates -> dropna -> all-zero mask -> dropna(how="all")),
+on the 196-column DIA training set and the ~49k-row adult set.
+
+Run from the repository root:
+    python -m bench.DataCleaningBenchmark --repeats 5
+'''
+
+DATASETS = {
+    "DIA": "Datasets/drug+induced+autoimmunity+prediction/DIA_trainingset_RDKit_descriptors.csv",
+    "adult": "Datasets/adult/adult.data",
+}
+
+
+def four_pass_cleaning(df):
+    df = df.drop_duplicates()
+    df = df.dropna()
+    df = df.loc[(df != 0).any(axis=1)]
+    return df.dropna(how="all")
+
+
+def measure(fn, df, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(df)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn(df)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), peak
+
+
+def run(repeats):
+    print(f"{'dataset':<8}{'rows':>8}{'cols':>6}  {'version':<12}{'ms':>8}{'peak MB':>10}")
+    for name, path in DATASETS.items():
+        df = data_reader(path)
+        cleaned, report = data_cleaning(df, report=True)
+        if not four_pass_cleaning(df).equals(cleaned):
+            raise AssertionError(f"data_cleaning disagrees with the four-pass version on {name}")
+        for label, fn in (("four-pass", four_pass_cleaning), ("single-pass", data_cleaning)):
+            elapsed, peak = measure(fn, df, repeats)
+            print(f"{name:<8}{df.shape[0]:>8}{df.shape[1]:>6}  {label:<12}{elapsed * 1e3:>8.1f}{peak / 1e6:>10.1f}")
+        print(f"{'':<8}report: {report}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="data_cleaning time/memory benchmark")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    run(args.repeats)
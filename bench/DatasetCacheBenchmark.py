@@ -0,0 +1,53 @@
+import argparse
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from DatasetCache import build_cache, load_columnar
+
+'''
+Cold vs warm load of the DIA descriptor CSVs:
+    csv    - pd.read_csv, what every load paid before the cache
+    build  - first load through the cache (parse once + write the entry)
+    warm   - later loads: memory-mapped .npy, as an array and as a DataFrame
+
+Run from the repository root:
+    python -m bench.DatasetCacheBenchmark --repeats 20
+'''
+
+DATASETS = {
+    "DIA train": "Datasets/drug+induced+autoimmunity+prediction/DIA_trainingset_RDKit_descriptors.csv",
+    "DIA test": "Datasets/drug+induced+autoimmunity+prediction/DIA_testset_RDKit_descriptors.csv",
+}
+
+
+def best_of(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(repeats):
+    cache_dir = tempfile.mkdtemp(prefix="dataset_cache_bench_")
+    try:
+        print(f"{'dataset':<12}{'csv ms':>10}{'build ms':>10}{'warm ms':>10}{'warm df ms':>12}{'speedup':>10}")
+        for name, path in DATASETS.items():
+            csv = best_of(lambda: pd.read_csv(path), repeats)
+            build = best_of(lambda: build_cache(path, cache_dir), 1)
+            warm = best_of(lambda: load_columnar(path, cache_dir), repeats)
+            warm_df = best_of(lambda: load_columnar(path, cache_dir).to_dataframe(), repeats)
+            print(f"{name:<12}{csv * 1e3:>10.2f}{build * 1e3:>10.2f}{warm * 1e3:>10.2f}{warm_df * 1e3:>12.2f}{csv / warm_df:>9.1f}x")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dataset cache cold/warm load benchmark")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    run(args.repeats)
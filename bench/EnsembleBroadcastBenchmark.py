@@ -0,0 +1,91 @@
+import argparse
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import torch
+import torch.nn as nn
+
+from QuantumLayers import HybridQNN
+
+'''
+Broadcast vs per-sample HybridQNN on the saved Ensemble Quantum-Classical
+Hybrid members (qnn_model_*.pth).
+
+For every member the script first checks that the broadcast forward pass
+gives the same logits and the same parameter and input gradients as the
+original per-sample loop (lightning.qubit, adjoint), then times one training
+epoch of each and reports the wall-clock speedup.
+
+Run from the repository root:
+    python -m bench.EnsembleBroadcastBenchmark --samples 256
+'''
+
+MODEL_DIR = "models/Ensemble Quantum-Classical Hybrid"
+TRAIN_PATH = "Datasets/drug+induced+autoimmunity+prediction/DIA_trainingset_RDKit_descriptors.csv"
+N_MEMBERS = 3
+
+
+def load_features(samples):
+    df = pd.read_csv(TRAIN_PATH)
+    scaler = joblib.load(f"{MODEL_DIR}/scaler.pkl")
+    pca = joblib.load(f"{MODEL_DIR}/pca.pkl")
+    X = pca.transform(scaler.transform(df.drop(columns=["Label", "SMILES"])))
+    y = df["Label"].values
+    return torch.tensor(X[:samples], dtype=torch.float32), torch.tensor(y[:samples], dtype=torch.float32)
+
+
+def check_member(state_dict, X, y, atol):
+    loop = HybridQNN.from_state_dict(state_dict, device="lightning.qubit", diff_method="adjoint", broadcast=False)
+    batched = HybridQNN.from_state_dict(state_dict)
+    criterion = nn.BCEWithLogitsLoss()
+
+    grads = []
+    for model in (loop, batched):
+        x = X.clone().requires_grad_(True)
+        logits = model(x)
+        criterion(logits, y).backward()
+        grads.append((logits.detach(), x.grad, {n: p.grad for n, p in model.named_parameters()}))
+
+    (logits_a, x_grad_a, p_grad_a), (logits_b, x_grad_b, p_grad_b) = grads
+    torch.testing.assert_close(logits_b, logits_a, atol=atol, rtol=0)
+    torch.testing.assert_close(x_grad_b, x_grad_a, atol=atol, rtol=0)
+    for name in p_grad_a:
+        torch.testing.assert_close(p_grad_b[name], p_grad_a[name], atol=atol, rtol=0, msg=f"gradient of {name}")
+
+
+def time_epoch(model, X, y, batch_size):
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-2)
+    criterion = nn.BCEWithLogitsLoss()
+    start = time.perf_counter()
+    for i in range(0, X.shape[0], batch_size):
+        optimizer.zero_grad()
+        loss = criterion(model(X[i:i + batch_size]), y[i:i + batch_size])
+        loss.backward()
+        optimizer.step()
+    return time.perf_counter() - start
+
+
+def run(samples, batch_size, atol):
+    X, y = load_features(samples)
+    print(f"samples={X.shape[0]} batch_size={batch_size}")
+    print(f"{'member':<8}{'check':<8}{'loop s/epoch':>14}{'broadcast s/epoch':>19}{'speedup':>10}")
+    for idx in range(N_MEMBERS):
+        state_dict = torch.load(f"{MODEL_DIR}/qnn_model_{idx}.pth")
+        check_member(state_dict, X[:batch_size], y[:batch_size], atol)
+
+        loop = HybridQNN.from_state_dict(state_dict, device="lightning.qubit", diff_method="adjoint", broadcast=False)
+        batched = HybridQNN.from_state_dict(state_dict)
+        loop_time = time_epoch(loop, X, y, batch_size)
+        batched_time = time_epoch(batched, X, y, batch_size)
+        print(f"{idx:<8}{'ok':<8}{loop_time:>14.2f}{batched_time:>19.2f}{loop_time / batched_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HybridQNN broadcast equivalence check and epoch timing")
+    parser.add_argument("--samples", type=int, default=256, help="training rows used for the timed epoch")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--atol", type=float, default=1e-4)
+    args = parser.parse_args()
+    run(args.samples, args.batch_size, args.atol)
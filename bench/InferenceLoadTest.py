@@ -0,0 +1,105 @@
+import argparse
+import json
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+'''
+Load test for InferenceServer: N concurrent clients post batches of DIA test
+rows to /predict and the script reports p50/p99 latency and throughput.
+
+Against a running instance:
+    python -m InferenceServer --port 8000 &
+    python -m bench.InferenceLoadTest --url http://127.0.0.1:8000 --clients 16
+
+Or let the script start (and stop) a local instance:
+    python -m bench.InferenceLoadTest --start --max-delay-ms 5
+'''
+
+TEST_PATH = "Datasets/drug+induced+autoimmunity+prediction/DIA_testset_RDKit_descriptors.csv"
+
+
+def post(url, body):
+    request = urllib.request.Request(f"{url}/predict", data=body, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def wait_healthy(url, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{url}/health") as response:
+                return json.loads(response.read())
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"{url} did not become healthy within {timeout}s")
+
+
+def client(url, bodies, n_requests, latencies, errors):
+    for i in range(n_requests):
+        start = time.perf_counter()
+        try:
+            post(url, bodies[i % len(bodies)])
+        except OSError as e:
+            errors.append(e)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+def run(url, clients, requests_per_client, rows_per_request):
+    df = pd.read_csv(TEST_PATH).drop(columns=["Label", "SMILES"])
+    rows = df.values.tolist()
+    bodies = [
+        json.dumps({"rows": rows[i:i + rows_per_request]}).encode("utf-8")
+        for i in range(0, len(rows) - rows_per_request + 1, rows_per_request)
+    ]
+    post(url, bodies[0])  # warm-up
+
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=client, args=(url, bodies, requests_per_client, latencies, errors))
+        for _ in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1e3
+    print(f"clients={clients} rows/request={rows_per_request} requests={latencies.size} errors={len(errors)}")
+    print(f"latency ms  p50={np.percentile(latencies, 50):.2f}  p99={np.percentile(latencies, 99):.2f}  max={latencies.max():.2f}")
+    print(f"throughput  {latencies.size / elapsed:.1f} req/s  {latencies.size * rows_per_request / elapsed:.1f} rows/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="InferenceServer load test")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--rows", type=int, default=4, help="rows per request")
+    parser.add_argument("--start", action="store_true", help="start a local InferenceServer for the run")
+    parser.add_argument("--max-delay-ms", type=float, default=5.0, help="passed to the server started with --start")
+    args = parser.parse_args()
+
+    server = None
+    if args.start:
+        port = args.url.rsplit(":", 1)[-1]
+        server = subprocess.Popen(
+            [sys.executable, "-m", "InferenceServer", "--port", port, "--max-delay-ms", str(args.max_delay_ms)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+    try:
+        wait_healthy(args.url, timeout=120)
+        run(args.url, args.clients, args.requests, args.rows)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
@@ -0,0 +1,356 @@
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+'''
+Reproducible benchmark of every model family on every dataset.
+
+Families:
+    full_classical - the FullClassical MLP of full classical.ipynb, on the scaled raw features
+    simpleencoding - HybridQNN (RY embedding, Rot layers, CNOT ring) on PCA(n_qubits) features
+    ensemble       - EnsembleRunner: n_members HybridQNNs + a random forest + a logistic
+                     regression, soft voting (0.5 mean QNN, 0.25 RF, 0.25 LR)
+    wdbc           - QuantumLayers.HybridModel: a classical extractor into a VQA layer, as
+                     the wdbc notebook, on the scaled raw features
+Datasets (all read with data_reader, then data_cleaning):
+    adult  - income >50K, numeric columns plus category codes
+    wdbc   - diagnosis M
+    dia    - Label, on the given training/test files
+    wine   - quality >= 7, red and white together
+The quantum families run on the batched numpy simulator, so their circuit
+counts are comparable.
+
+Every (model, dataset) pair runs in its own spawned process with a fixed
+seed and one torch thread, so timings and peak RSS are per pair and a run is
+repeatable. Per pair the results file records train samples/s, mean epoch
+time, inference samples/s, peak RSS, circuit executions per optimizer step,
+AUC and accuracy. Epoch time is the median over epochs, inference the
+fastest of infer_repeats passes. For the ensemble an epoch covers all QNN
+members; the RF and LR fits are not part of it.
+
+Run from the repository root:
+    python -m bench.ModelSuite --output bench/results/baseline.json
+    python -m bench.ModelSuite --baseline bench/results/baseline.json        # run, then flag regressions
+    python -m bench.ModelSuite --compare new.json --baseline baseline.json   # compare two files only
+The exit code is 1 when a regression is flagged.
+'''
+
+MODELS = ["full_classical", "simpleencoding", "ensemble", "wdbc"]
+
+DIA_DIR = "Datasets/drug+induced+autoimmunity+prediction"
+DATASETS = {
+    "adult": {"paths": ["Datasets/adult/adult.data"]},
+    "wdbc": {"paths": ["Datasets/breast+cancer+wisconsin+diagnostic/wdbc.data"]},
+    "dia": {"paths": [f"{DIA_DIR}/DIA_trainingset_RDKit_descriptors.csv"],
+            "test_paths": [f"{DIA_DIR}/DIA_testset_RDKit_descriptors.csv"]},
+    "wine": {"paths": ["Datasets/wine+quality/winequality-red.csv", "Datasets/wine+quality/winequality-white.csv"]},
+}
+
+# metric: (direction, kind of tolerance); higher-is-better metrics regress when they drop
+METRICS = {
+    "train_samples_per_s": ("higher", "relative"),
+    "infer_samples_per_s": ("higher", "relative"),
+    "epoch_time_s": ("lower", "relative"),
+    "peak_rss_mb": ("lower", "relative"),
+    "circuit_executions_per_step": ("lower", "relative"),
+    "auc": ("higher", "absolute"),
+}
+
+
+# ---Datasets---
+def _read(path):
+    from DataFilesNormalization import data_cleaning, data_reader
+
+    df = data_reader(path)
+    # data_reader numbers the rows of sniffed files; the index would hide duplicates
+    df = df.drop(columns=[col for col in df.columns if str(col).lower() == "index"])
+    # data drops the SMILES column of the DIA files
+    return data_cleaning(df, data=os.path.basename(path) if "SMILES" in df.columns else None)
+
+
+def _features(name, df):
+    if name == "adult":
+        from DataFilesNormalization import adult_categories
+
+        y = (df["income"] == ">50K").to_numpy()
+        X = df.drop(columns=["income"])
+        for col, levels in adult_categories.items():
+            if col in X.columns:
+                X[col] = pd.Categorical(X[col], categories=levels).codes
+    elif name == "wdbc":
+        y = (df["diagnosis"] == "M").to_numpy()
+        X = df.drop(columns=["id", "diagnosis"])
+    elif name == "dia":
+        y = df["Label"].to_numpy() == 1
+        X = df.drop(columns=["Label"])
+    elif name == "wine":
+        y = (df["quality"] >= 7).to_numpy()
+        X = df.drop(columns=["quality"])
+    else:
+        raise ValueError(f"Unknown dataset: {name}")
+    return X.to_numpy(dtype=np.float64), y.astype(np.float64)
+
+
+def load_dataset(name, seed=42, max_train=2000, test_size=0.3):
+    '''
+    Fixed-seed (X_train, y_train, X_test, y_test) for a dataset. Without its
+    own test file the data is split stratified; the training set is then
+    subsampled to max_train rows so a suite run stays short.
+    '''
+    from sklearn.model_selection import train_test_split
+
+    spec = DATASETS[name]
+    if name == "wine":
+        frames = [_read(path).assign(red=float("red" in path)) for path in spec["paths"]]
+    else:
+        frames = [_read(path) for path in spec["paths"]]
+    X, y = _features(name, pd.concat(frames, ignore_index=True))
+    if "test_paths" in spec:
+        X_test, y_test = _features(name, pd.concat([_read(path) for path in spec["test_paths"]], ignore_index=True))
+        X_train, y_train = X, y
+    else:
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, stratify=y, random_state=seed)
+    if max_train and len(X_train) > max_train:
+        X_train, _, y_train, _ = train_test_split(X_train, y_train, train_size=max_train, stratify=y_train, random_state=seed)
+    return X_train, y_train, X_test, y_test
+
+
+# ---Models---
+def _standardize(X_train, X_test):
+    mean, scale = X_train.mean(axis=0), X_train.std(axis=0)
+    scale[scale == 0] = 1.0
+    return (X_train - mean) / scale, (X_test - mean) / scale
+
+
+def _fit_torch(model, X, y, loss_fn, config):
+    import torch
+
+    optimizer = torch.optim.Adam(model.parameters(), lr=config["lr"])
+    loader = torch.utils.data.DataLoader(
+        torch.utils.data.TensorDataset(torch.tensor(X, dtype=torch.float32), torch.tensor(y, dtype=torch.float32)),
+        batch_size=config["batch_size"], shuffle=True, generator=torch.Generator().manual_seed(config["seed"]),
+    )
+    epoch_times, steps = [], 0
+    model.train()
+    for epoch in range(config["epochs"]):
+        start = time.perf_counter()
+        for Xb, yb in loader:
+            optimizer.zero_grad()
+            loss = loss_fn(model(Xb), yb)
+            loss.backward()
+            optimizer.step()
+            steps += 1
+        epoch_times.append(time.perf_counter() - start)
+    model.eval()
+    return epoch_times, steps
+
+
+def _predict_torch(model, X, proba):
+    import torch
+
+    with torch.no_grad():
+        return proba(model(torch.tensor(X, dtype=torch.float32))).numpy().astype(np.float64)
+
+
+def run_model(model_name, X_train, y_train, X_test, y_test, config, workdir):
+    '''Train and score one family; returns (epoch_times, steps, predict_fn).'''
+    import torch
+    import torch.nn as nn
+
+    if model_name == "full_classical":
+        from InferenceServer import FullClassical
+
+        X_train, X_test = _standardize(X_train, X_test)
+        model = FullClassical(X_train.shape[1], 2)
+        cross_entropy = nn.CrossEntropyLoss()
+        epoch_times, steps = _fit_torch(model, X_train, y_train, lambda out, yb: cross_entropy(out, yb.long()), config)
+        return epoch_times, steps, lambda: _predict_torch(model, X_test, lambda out: out[:, 1])
+
+    if model_name == "wdbc":
+        from QuantumLayers import HybridModel
+
+        X_train, X_test = _standardize(X_train, X_test)
+        model = HybridModel(X_train.shape[1], config["n_qubits"], config["n_layers"])
+        bce = nn.BCELoss()
+        epoch_times, steps = _fit_torch(model, X_train, y_train, lambda out, yb: bce(out.view(-1), yb), config)
+        return epoch_times, steps, lambda: _predict_torch(model, X_test, lambda out: out.view(-1))
+
+    from Preprocessing import PreprocessingPipeline
+
+    preprocessing = PreprocessingPipeline.fit(X_train, n_components=config["n_qubits"], seed=config["seed"])
+
+    if model_name == "simpleencoding":
+        from QuantumLayers import HybridQNN
+
+        model = HybridQNN(config["n_qubits"], config["n_layers"], device="numpy")
+        epoch_times, steps = _fit_torch(model, preprocessing.transform(X_train), y_train, nn.BCEWithLogitsLoss(), config)
+        features = preprocessing.transform(X_test)
+        return epoch_times, steps, lambda: _predict_torch(model, features, torch.sigmoid)
+
+    if model_name == "ensemble":
+        from EnsembleRunner import EnsembleRunner
+
+        preprocessing.save(os.path.join(workdir, "preprocessing.npz"))
+        runner = EnsembleRunner(
+            workdir, n_members=config["n_members"], n_workers=0, seed=config["seed"],
+            n_qubits=config["n_qubits"], n_layers=config["n_layers"], pre=False, epochs=config["epochs"],
+            batch_size=config["batch_size"], lr=config["lr"], device="numpy",
+        )
+        start = time.perf_counter()
+        runner.fit(X_train, y_train, kinds=("qnn",))
+        elapsed = time.perf_counter() - start
+        runner.fit(X_train, y_train, kinds=("rf", "lr"))
+        # QNN members train one after another in-process; an epoch covers all of them
+        steps = config["n_members"] * config["epochs"] * math.ceil(len(X_train) / config["batch_size"])
+        return [elapsed / config["epochs"]] * config["epochs"], steps, lambda: runner.predict_proba(X_test)
+
+    raise ValueError(f"Unknown model: {model_name}")
+
+
+def run_pair(model_name, dataset, config):
+    import torch
+    from sklearn.metrics import roc_auc_score
+
+    from CircuitRegistry import registry
+
+    torch.set_num_threads(config["threads"])
+    torch.manual_seed(config["seed"])
+    np.random.seed(config["seed"])
+
+    X_train, y_train, X_test, y_test = load_dataset(dataset, config["seed"], config["max_train"])
+    with tempfile.TemporaryDirectory(prefix="model_suite_") as workdir:
+        epoch_times, steps, predict = run_model(model_name, X_train, y_train, X_test, y_test, config, workdir)
+        executions = sum(sim.executions for sim in registry.entries("simulator"))
+
+        # Best of a few repeats: one pass over a small test set is too short to time once
+        infer_times = []
+        for _ in range(config["infer_repeats"]):
+            start = time.perf_counter()
+            probs = predict()
+            infer_times.append(time.perf_counter() - start)
+        infer_time = min(infer_times)
+
+    epoch_time = float(np.median(epoch_times))
+    return {
+        "model": model_name, "dataset": dataset,
+        "n_train": int(len(X_train)), "n_test": int(len(X_test)), "n_features": int(X_train.shape[1]),
+        "epoch_time_s": epoch_time,
+        "train_samples_per_s": len(X_train) / epoch_time,
+        "infer_samples_per_s": len(X_test) / infer_time,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "circuit_executions_per_step": executions / steps,
+        "auc": float(roc_auc_score(y_test, probs)),
+        "accuracy": float(((probs >= 0.5) == y_test).mean()),
+    }
+
+
+def _run_isolated(model_name, dataset, config):
+    # A fresh process per pair: peak RSS and circuit counters belong to this pair only
+    with ProcessPoolExecutor(max_workers=1, mp_context=mp.get_context("spawn")) as pool:
+        return pool.submit(run_pair, model_name, dataset, config).result()
+
+
+def run_suite(models, datasets, config):
+    import torch
+
+    results = []
+    for dataset in datasets:
+        for model_name in models:
+            result = _run_isolated(model_name, dataset, config)
+            results.append(result)
+            print(f"{model_name:<16}{dataset:<7}{result['epoch_time_s']:>10.3f}{result['train_samples_per_s']:>12.0f}"
+                  f"{result['infer_samples_per_s']:>12.0f}{result['peak_rss_mb']:>10.0f}"
+                  f"{result['circuit_executions_per_step']:>10.0f}{result['auc']:>8.3f}", flush=True)
+    return {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+            "torch": torch.__version__, "numpy": np.__version__, "machine": platform.machine(),
+            "cpu_count": os.cpu_count(), "config": config,
+        },
+        "results": results,
+    }
+
+
+# ---Comparison---
+def compare(current, baseline, tolerance=0.2, auc_tolerance=0.01):
+    '''
+    Flag every metric that got worse than the baseline by more than tolerance
+    (relative) or auc_tolerance (absolute). Returns a list of regression strings.
+    '''
+    base = {(r["model"], r["dataset"]): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        ref = base.get((result["model"], result["dataset"]))
+        if ref is None:
+            continue
+        for metric, (direction, kind) in METRICS.items():
+            old, new = ref[metric], result[metric]
+            change = new - old if kind == "absolute" else (new - old) / old if old else 0.0
+            limit = auc_tolerance if kind == "absolute" else tolerance
+            worse = -change if direction == "higher" else change
+            if worse > limit:
+                regressions.append(f"{result['model']}/{result['dataset']} {metric}: {old:.4g} -> {new:.4g} ({change:+.1%})"
+                                   if kind == "relative" else
+                                   f"{result['model']}/{result['dataset']} {metric}: {old:.4f} -> {new:.4f} ({change:+.4f})")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every model family on every dataset")
+    parser.add_argument("--models", nargs="+", default=MODELS, choices=MODELS)
+    parser.add_argument("--datasets", nargs="+", default=list(DATASETS), choices=list(DATASETS))
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--lr", type=float, default=1e-2)
+    parser.add_argument("--n-qubits", type=int, default=5)
+    parser.add_argument("--n-layers", type=int, default=4)
+    parser.add_argument("--n-members", type=int, default=3, help="QNN members of the ensemble")
+    parser.add_argument("--max-train", type=int, default=2000, help="training rows per dataset (0 = all)")
+    parser.add_argument("--infer-repeats", type=int, default=5, help="inference passes, the fastest is recorded")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--threads", type=int, default=1, help="torch threads per pair")
+    parser.add_argument("--output", default="bench/results/model_suite.json")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--compare", help="compare this results file with --baseline instead of running")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown/growth")
+    parser.add_argument("--auc-tolerance", type=float, default=0.01, help="allowed absolute AUC drop")
+    args = parser.parse_args()
+
+    if args.compare:
+        if not args.baseline:
+            parser.error("--compare needs --baseline")
+        with open(args.compare, encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        config = {
+            "epochs": args.epochs, "batch_size": args.batch_size, "lr": args.lr, "n_qubits": args.n_qubits,
+            "n_layers": args.n_layers, "n_members": args.n_members, "max_train": args.max_train,
+            "infer_repeats": args.infer_repeats, "seed": args.seed, "threads": args.threads,
+        }
+        print(f"{'model':<16}{'data':<7}{'epoch s':>10}{'train/s':>12}{'infer/s':>12}{'RSS MB':>10}{'circ/step':>10}{'AUC':>8}")
+        current = run_suite(args.models, args.datasets, config)
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.tolerance, args.auc_tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        print(f"{len(regressions)} regression(s) against {args.baseline}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,85 @@
+import argparse
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from DataFilesNormalization import data_cleaning
+from DatasetCache import CACHE_DIR
+from DIAHelper import Helper
+from Preprocessing import PreprocessingPipeline
+from Profiler import profiler
+from QuantumLayers import HybridModel, HybridQNN
+
+'''
+Where does a hybrid training epoch go? Loads the DIA training set through
+DIAHelper, cleans it, fits the scaler + PCA and trains a hybrid model with
+the profiler enabled, then prints the per-epoch stage table and writes a
+Chrome trace. Epoch 0 is the data loading and preprocessing.
+
+Run from the repository root:
+    python -m bench.ProfileTraining --model qnn --epochs 3 --trace trace.json
+    python -m bench.ProfileTraining --model skeleton --diff-method parameter-shift --memory
+'''
+
+TRAIN_PATH = "Datasets/drug+induced+autoimmunity+prediction/DIA_trainingset_RDKit_descriptors.csv"
+TEST_PATH = "Datasets/drug+induced+autoimmunity+prediction/DIA_testset_RDKit_descriptors.csv"
+
+
+def run(model_name, epochs, batch_size, n_qubits, n_layers, diff_method, cache, memory, trace):
+    torch.manual_seed(42)
+    profiler.enable(memory=memory)
+
+    helper = Helper(TRAIN_PATH, TEST_PATH, cache_dir=CACHE_DIR if cache else None)
+    df = data_cleaning(helper.train_df, data="DIA_trainingset_RDKit_descriptors.csv")
+    columns = [col for col in df.columns if col != "Label"]
+    preprocessing = PreprocessingPipeline.fit(df[columns].to_numpy(dtype=np.float64), columns, n_components=n_qubits)
+    features = preprocessing.transform(df[columns])
+    with profiler.stage("to_tensor"):
+        X = torch.tensor(features, dtype=torch.float32)
+        y = torch.tensor(df["Label"].to_numpy(), dtype=torch.float32)
+
+    if model_name == "qnn":
+        model = HybridQNN(n_qubits, n_layers, device="numpy", diff_method=diff_method)
+        criterion = nn.BCEWithLogitsLoss()
+    else:
+        model = HybridModel(n_qubits, n_qubits, n_layers, diff_method=diff_method)
+        bce = nn.BCELoss()
+        criterion = lambda out, target: bce(out.view(-1), target)
+    optimizer = torch.optim.Adam(model.parameters(), lr=1e-2)
+    loader = torch.utils.data.DataLoader(torch.utils.data.TensorDataset(X, y), batch_size=batch_size, shuffle=True,
+                                         generator=torch.Generator().manual_seed(42))
+    profiler.next_epoch()
+
+    for epoch in range(epochs):
+        for Xb, yb in loader:
+            optimizer.zero_grad()
+            with profiler.stage("loss"):
+                loss = criterion(model(Xb), yb)
+            with profiler.stage("backward"):
+                loss.backward()
+            with profiler.stage("optimizer.step"):
+                optimizer.step()
+        profiler.next_epoch()
+
+    print(profiler.table())
+    if trace:
+        print(f"Chrome trace written to {profiler.save_trace(trace)}")
+    profiler.disable()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-stage profile of hybrid training on DIA")
+    parser.add_argument("--model", choices=["qnn", "skeleton"], default="qnn",
+                        help="HybridQNN on the simulator, or the skeleton HybridModel")
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--n-qubits", type=int, default=5)
+    parser.add_argument("--n-layers", type=int, default=4)
+    parser.add_argument("--diff-method", default="best", choices=["best", "adjoint", "parameter-shift"])
+    parser.add_argument("--no-cache", action="store_true", help="parse the CSV instead of the columnar cache")
+    parser.add_argument("--memory", action="store_true", help="also record bytes allocated (tracemalloc)")
+    parser.add_argument("--trace", default="profile_trace.json", help="Chrome trace output ('' to skip)")
+    args = parser.parse_args()
+    run(args.model, args.epochs, args.batch_size, args.n_qubits, args.n_layers, args.diff_method,
+        not args.no_cache, args.memory, args.trace)
@@ -0,0 +1,96 @@
+import argparse
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from DatasetCache import load_dataframe
+from Preprocessing import PreprocessingPipeline
+from QuantumLayers import HybridQNN
+
+'''
+Accuracy vs shots vs wall clock for HybridQNN on the DIA test set.
+
+Every setting trains the same model (HybridQNN with the classical pre layer,
+as in the ensemble members; same seed, same batches) on the PCA features of
+the DIA training set and scores the test set:
+    exact          - exact <Z_0>, adjoint gradients
+    shots=N        - N shots per circuit, parameter-shift with a uniform split
+    shots=N adapt  - the same budget split across the shift terms by their
+                     estimated variance (VQASimulator.ShotSampler)
+Total shots (training + test inference) is reported next to AUC, accuracy
+and wall time, so the cost of finite-shot execution can be budgeted.
+
+Run from the repository root:
+    python -m bench.ShotBudgetBenchmark --shots 100 1000 10000 --epochs 5
+'''
+
+DIA_DIR = "Datasets/drug+induced+autoimmunity+prediction"
+
+
+def load_dia(n_qubits, seed):
+    train = load_dataframe(f"{DIA_DIR}/DIA_trainingset_RDKit_descriptors.csv").drop(columns=["SMILES"])
+    test = load_dataframe(f"{DIA_DIR}/DIA_testset_RDKit_descriptors.csv").drop(columns=["SMILES"])
+    columns = [col for col in train.columns if col != "Label"]
+    preprocessing = PreprocessingPipeline.fit(train[columns].to_numpy(dtype=np.float64), columns, n_qubits, seed)
+    return (preprocessing.transform(train[columns]), train["Label"].to_numpy(dtype=np.float64),
+            preprocessing.transform(test[columns]), test["Label"].to_numpy(dtype=np.float64))
+
+
+def train_and_score(data, n_qubits, n_layers, epochs, batch_size, lr, seed, shots=None, adaptive=False):
+    from sklearn.metrics import roc_auc_score
+
+    X_train, y_train, X_test, y_test = (torch.tensor(a, dtype=torch.float32) for a in data)
+    torch.manual_seed(seed)
+    model = HybridQNN(n_qubits, n_layers, pre=True, device="numpy", shots=shots, adaptive_shots=adaptive, seed=seed)
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+    criterion = nn.BCEWithLogitsLoss()
+    loader = torch.utils.data.DataLoader(torch.utils.data.TensorDataset(X_train, y_train), batch_size=batch_size,
+                                         shuffle=True, generator=torch.Generator().manual_seed(seed))
+    start = time.perf_counter()
+    model.train()
+    for epoch in range(epochs):
+        for Xb, yb in loader:
+            optimizer.zero_grad()
+            criterion(model(Xb), yb).backward()
+            optimizer.step()
+    train_time = time.perf_counter() - start
+
+    sampler = model.qlayer.simulator
+    train_shots = getattr(sampler, "total_shots", 0)
+    model.eval()
+    with torch.no_grad():
+        probs = torch.sigmoid(model(X_test)).numpy()
+    return {
+        "auc": roc_auc_score(y_test.numpy(), probs),
+        "accuracy": float(((probs >= 0.5) == y_test.numpy()).mean()),
+        "train_shots": train_shots,
+        "test_shots": getattr(sampler, "total_shots", 0) - train_shots,
+        "train_s": train_time,
+    }
+
+
+def run(shot_counts, n_qubits, n_layers, epochs, batch_size, lr, seed):
+    data = load_dia(n_qubits, seed)
+    settings = [("exact", None, False)]
+    for shots in shot_counts:
+        settings += [(f"shots={shots}", shots, False), (f"shots={shots} adapt", shots, True)]
+
+    print(f"{'setting':<20}{'AUC':>8}{'acc':>8}{'train shots':>14}{'test shots':>12}{'train s':>10}")
+    for name, shots, adaptive in settings:
+        r = train_and_score(data, n_qubits, n_layers, epochs, batch_size, lr, seed, shots, adaptive)
+        print(f"{name:<20}{r['auc']:>8.3f}{r['accuracy']:>8.3f}{r['train_shots']:>14.3g}{r['test_shots']:>12.3g}{r['train_s']:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DIA accuracy against shot budget")
+    parser.add_argument("--shots", type=int, nargs="+", default=[100, 1000, 10000], help="shots per circuit")
+    parser.add_argument("--n-qubits", type=int, default=5)
+    parser.add_argument("--n-layers", type=int, default=4)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--lr", type=float, default=5e-2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.shots, args.n_qubits, args.n_layers, args.epochs, args.batch_size, args.lr, args.seed)
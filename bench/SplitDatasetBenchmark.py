@@ -0,0 +1,97 @@
+import argparse
+import multiprocessing as mp
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import torch
+
+from SplitDataset import from_torch_splits, open_split_dataset
+
+'''
+torch.load of per-split .pt pickles vs the memory-mapped split dataset file.
+
+Each measurement runs in a fresh process and reports:
+    open ms     - time to get every split as tensors
+    open anon MB - private (anonymous) memory the process gained doing so
+    pass ms     - time for one full read over every split (sum of the features)
+    pass anon MB - private memory after that read
+File pages touched through the mapping show up as RssFile (page cache shared
+with every other process reading the file), not as private memory.
+
+Datasets: the models/wdbc splits, and a synthetic DIA-shaped set (--rows x 196
+float32, 80/10/10) written both ways into a temp directory.
+
+Run from the repository root:
+    python -m bench.SplitDatasetBenchmark --rows 200000
+'''
+
+SPLITS = ("train", "val", "test")
+
+
+def anon_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("RssAnon:"):
+                return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def measure(kind, source):
+    base = anon_mb()
+    start = time.perf_counter()
+    if kind == "torch.load":
+        tensors = [(torch.load(f"{source}_{name}.pt"), torch.load(f"{source}_{name}_label.pt")) for name in SPLITS]
+    else:
+        data = open_split_dataset(source)
+        tensors = [data.split(name) for name in SPLITS]
+    opened = time.perf_counter()
+    open_anon = anon_mb() - base
+    total = sum(float(X.sum()) + float(y.sum()) for X, y in tensors)
+    passed = time.perf_counter()
+    return {"open_ms": (opened - start) * 1e3, "open_anon_mb": open_anon,
+            "pass_ms": (passed - opened) * 1e3, "pass_anon_mb": anon_mb() - base, "checksum": total}
+
+
+def in_fresh_process(kind, source):
+    with ProcessPoolExecutor(1, mp_context=mp.get_context("spawn")) as pool:
+        return pool.submit(measure, kind, source).result()
+
+
+def write_synthetic(directory, rows, n_features=196, seed=0):
+    rng = np.random.default_rng(seed)
+    X = torch.from_numpy(rng.normal(size=(rows, n_features)).astype(np.float32))
+    y = torch.from_numpy((rng.random((rows, 1)) < 0.25).astype(np.float32))
+    prefix = os.path.join(directory, "synthetic")
+    cuts = [0, int(rows * 0.8), int(rows * 0.9), rows]
+    for name, start, stop in zip(SPLITS, cuts, cuts[1:]):
+        torch.save(X[start:stop].clone(), f"{prefix}_{name}.pt")
+        torch.save(y[start:stop].clone(), f"{prefix}_{name}_label.pt")
+    return prefix
+
+
+def run(rows, repeats):
+    directory = tempfile.mkdtemp(prefix="split_dataset_bench_")
+    try:
+        prefixes = {"wdbc": "models/wdbc/wdbc", f"synthetic {rows}": write_synthetic(directory, rows)}
+        print(f"{'dataset':<20}{'format':<12}{'open ms':>10}{'open anon MB':>14}{'pass ms':>10}{'pass anon MB':>14}")
+        for name, prefix in prefixes.items():
+            tds = from_torch_splits(prefix, os.path.join(directory, f"{os.path.basename(prefix)}.tds"))
+            for kind, source in (("torch.load", prefix), ("tds", tds)):
+                results = [in_fresh_process(kind, source) for _ in range(repeats)]
+                best = {key: min(r[key] for r in results) for key in results[0]}
+                print(f"{name:<20}{kind:<12}{best['open_ms']:>10.2f}{best['open_anon_mb']:>14.1f}"
+                      f"{best['pass_ms']:>10.2f}{best['pass_anon_mb']:>14.1f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="torch.load vs memory-mapped split dataset")
+    parser.add_argument("--rows", type=int, default=200_000, help="rows of the synthetic dataset")
+    parser.add_argument("--repeats", type=int, default=3, help="fresh processes per measurement (best is kept)")
+    args = parser.parse_args()
+    run(args.rows, args.repeats)
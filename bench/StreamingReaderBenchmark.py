@@ -0,0 +1,74 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+from DataFilesNormalization import adult_columns, iter_data
+
+'''
+Peak memory of streaming the adult dataset with iter_data against reading it
+whole with pd.read_csv, on 1x, 4x and 16x copies of adult.data.
+
+The streaming peak should stay flat as the file grows (it depends on
+chunksize), while the whole-file read grows with the file.
+
+Run from the repository root:
+    python -m bench.StreamingReaderBenchmark --copies 1 4 16 --chunksize 100000
+'''
+
+SOURCE = "Datasets/adult/adult.data"
+
+
+def write_copies(directory, copies):
+    path = os.path.join(directory, f"adult_x{copies}.data")
+    with open(SOURCE, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        for _ in range(copies):
+            f.write(data)
+    return path
+
+
+def measure(fn):
+    # Timed without tracing; tracemalloc slows the per-value string handling down a lot
+    start = time.perf_counter()
+    rows = fn()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return rows, seconds, peak / 2**20
+
+
+def stream(path, chunksize):
+    return sum(len(chunk) for chunk in iter_data([path], chunksize=chunksize))
+
+
+def read_whole(path):
+    return len(pd.read_csv(path, names=adult_columns, skipinitialspace=True, na_values="?").dropna())
+
+
+def run(copies, chunksize):
+    directory = tempfile.mkdtemp(prefix="streaming_bench_")
+    try:
+        print(f"{'copies':>7}{'rows':>10}{'stream s':>10}{'stream MB':>11}{'read_csv s':>12}{'read_csv MB':>13}")
+        for n in copies:
+            path = write_copies(directory, n)
+            rows, stream_s, stream_mb = measure(lambda: stream(path, chunksize))
+            _, whole_s, whole_mb = measure(lambda: read_whole(path))
+            print(f"{n:>7}{rows:>10}{stream_s:>10.2f}{stream_mb:>11.1f}{whole_s:>12.2f}{whole_mb:>13.1f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Streaming vs whole-file peak memory on the adult dataset")
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--chunksize", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args.copies, args.chunksize)
@@ -0,0 +1,100 @@
+import argparse
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from DataFilesNormalization import data_reader
+from QuantumLayers import VQALayer
+
+'''
+Samples/sec of the VQA layer on the wdbc and DIA datasets:
+    qiskit/row - one StatevectorEstimator job per sample (the layer called
+                 on single rows), the baseline the speedups are relative to
+    qiskit     - the whole batch bound into one StatevectorEstimator job
+    numpy      - the batched NumPy simulator
+
+Run from the repository root:
+    python -m bench.VQABackendBenchmark --n-qubits 5 --n-layers 4
+'''
+
+DATASETS = {
+    "wdbc": ("Datasets/breast+cancer+wisconsin+diagnostic/wdbc.data", ["id", "diagnosis"]),
+    "DIA": ("Datasets/drug+induced+autoimmunity+prediction/DIA_trainingset_RDKit_descriptors.csv", ["index", "Label", "SMILES"]),
+}
+
+
+def load_features(name, n_qubits, seed=0):
+    path, drop = DATASETS[name]
+    df = data_reader(path)
+    X = df.drop(columns=drop).values.astype(np.float32)
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+    X = (X - X.mean(axis=0)) / std
+    # Same shape of input the quantum layer sees inside HybridModel
+    torch.manual_seed(seed)
+    with torch.no_grad():
+        return torch.tanh(nn.Linear(X.shape[1], n_qubits)(torch.from_numpy(X)))
+
+
+def time_layer(layer, X, backward):
+    start = time.perf_counter()
+    if backward:
+        layer.zero_grad()
+        layer(X).sum().backward()
+    else:
+        with torch.no_grad():
+            layer(X)
+    return time.perf_counter() - start
+
+
+def time_per_row(layer, X, backward):
+    # One layer call, and so one estimator job (per shift for the backward), per sample
+    start = time.perf_counter()
+    if backward:
+        layer.zero_grad()
+        for i in range(X.shape[0]):
+            layer(X[i:i + 1]).sum().backward()
+    else:
+        with torch.no_grad():
+            for i in range(X.shape[0]):
+                layer(X[i:i + 1])
+    return time.perf_counter() - start
+
+
+def run(n_qubits, n_layers, qiskit_samples, repeats, diff_method):
+    print(f"n_qubits={n_qubits} n_layers={n_layers} diff_method={diff_method}")
+    print(f"{'dataset':<8}{'pass':<18}{'backend':<12}{'samples':>8}{'samples/sec':>14}{'speedup':>10}")
+    for name in DATASETS:
+        X = load_features(name, n_qubits)
+        for backward in (False, True):
+            torch.manual_seed(0)
+            layer = VQALayer(n_qubits, n_layers, backend="numpy", diff_method=diff_method)
+            elapsed = min(time_layer(layer, X, backward) for _ in range(repeats))
+            numpy_rate = X.shape[0] / elapsed
+
+            layer.backend = "qiskit"
+            layer.diff_method = "parameter-shift"
+            X_small = X[:qiskit_samples]
+            time_layer(layer, X_small[:1], backward)  # warm-up: Qiskit imports and template build
+            row_rate = X_small.shape[0] / time_per_row(layer, X_small, backward)
+            batch_rate = X_small.shape[0] / time_layer(layer, X_small, backward)
+
+            label = "forward+backward" if backward else "forward"
+            for backend, samples, rate in (("qiskit/row", X_small.shape[0], row_rate),
+                                           ("qiskit", X_small.shape[0], batch_rate),
+                                           ("numpy", X.shape[0], numpy_rate)):
+                print(f"{name:<8}{label:<18}{backend:<12}{samples:>8}{rate:>14.1f}{rate / row_rate:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="VQA backend throughput benchmark")
+    parser.add_argument("--n-qubits", type=int, default=5)
+    parser.add_argument("--n-layers", type=int, default=4)
+    parser.add_argument("--qiskit-samples", type=int, default=32, help="the Qiskit path is slow; time it on a prefix")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--diff-method", default="best", choices=["best", "adjoint", "parameter-shift"],
+                        help="gradient method of the numpy backend")
+    args = parser.parse_args()
+    run(args.n_qubits, args.n_layers, args.qiskit_samples, args.repeats, args.diff_method)
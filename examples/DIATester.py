@@ -5,3 +5,5 @@ DIA_Helper = DIAHelper("Datasets/drug+induced+autoimmunity+prediction/DIA_traini
 
 print(DIA_Helper.get_col_idx_map())
 print(DIA_Helper.get_col_prop_map(0))
+print(DIA_Helper.catalog.select_names(groups=["Chi*"]))
+print(DIA_Helper.select(groups=["fr_*", "Chi*"]).shape)